@@ -1,20 +1,39 @@
 import os
+import queue
+import shutil
 import sys
+import tempfile
+import threading
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
 
 # Ensure the src directory is in the sys.path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from TextToVideo import TextToVideo  # Ensure this import path is correct
+from src.utils.common import RenderCancelled
+from src.instance import config
+from src.video.encoder_profiles import DRAFT_PROFILE, load_profiles
+
+POLL_INTERVAL_MS = 100
+STAGE_LABELS = {
+    "images": "Fetching images",
+    "audio": "Generating voiceover",
+    "compose": "Composing",
+}
 
 
 class TextToVideoGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Text to Video Converter")
-        self.root.geometry("500x400")
+        self.root.geometry("540x550")
+        self.events = queue.Queue()
+        self.cancel_event = None
+        self.worker = None
+        self.draft_ttv = None
         self.create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_widgets(self):
         # Input text label
@@ -36,9 +55,35 @@ class TextToVideoGUI:
         self.output_file_entry = tk.Entry(self.root, width=50)
         self.output_file_entry.pack(pady=5)
 
-        # Convert button
-        self.convert_button = tk.Button(self.root, text="Convert", command=self.convert)
-        self.convert_button.pack(pady=20)
+        # Draft mode renders a quick low-resolution preview
+        self.draft_var = tk.BooleanVar(value=False)
+        self.draft_check = tk.Checkbutton(self.root, text="Draft preview (480p, fast)", variable=self.draft_var)
+        self.draft_check.pack()
+
+        # Encoder profile of full-quality renders
+        profile_frame = tk.Frame(self.root)
+        profile_frame.pack(pady=5)
+        tk.Label(profile_frame, text="Encoder profile:").pack(side=tk.LEFT)
+        profiles = [name for name in load_profiles() if name != DRAFT_PROFILE]
+        self.profile_var = tk.StringVar(value=config.config()["ENCODER_PROFILE"])
+        self.profile_box = ttk.Combobox(profile_frame, textvariable=self.profile_var, values=profiles, state="readonly")
+        self.profile_box.pack(side=tk.LEFT, padx=5)
+
+        # Convert and cancel buttons
+        buttons = tk.Frame(self.root)
+        buttons.pack(pady=(20, 10))
+        self.convert_button = tk.Button(buttons, text="Convert", command=self.convert)
+        self.convert_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = tk.Button(buttons, text="Cancel", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        self.promote_button = tk.Button(buttons, text="Render Full Quality", command=self.promote, state=tk.DISABLED)
+        self.promote_button.pack(side=tk.LEFT, padx=5)
+
+        # Progress bar and status
+        self.progress_bar = ttk.Progressbar(self.root, length=400, maximum=100, mode="determinate")
+        self.progress_bar.pack(pady=5)
+        self.status_label = tk.Label(self.root, text="")
+        self.status_label.pack()
 
     def choose_input_file(self):
         filetypes = [("Text files", "*.txt"), ("All files", "*.*")]
@@ -64,13 +109,111 @@ class TextToVideoGUI:
             messagebox.showerror("Error", "Output file name is empty.")
             return
 
+        draft = self.draft_var.get()
+        profile = self.profile_var.get()
+        self.start(lambda: TextToVideo(text, output_file + ".mp4", draft=draft, profile=profile),
+                   TextToVideo.generate_video)
+
+    def promote(self):
+        draft_ttv = self.draft_ttv
+        self.start(lambda: draft_ttv, TextToVideo.promote)
+
+    def start(self, get_ttv, run):
+        self.cancel_event = threading.Event()
+        self.set_running(True)
+        self.progress_bar["value"] = 0
+        self.status_label.config(text="Starting...")
+        self.worker = threading.Thread(target=self.render, args=(get_ttv, run, self.cancel_event), daemon=True)
+        self.worker.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll_events)
+
+    def render(self, get_ttv, run, cancel_event):
+        # Runs on the worker thread; only talks to the UI through self.events
+        work_dir = tempfile.mkdtemp(prefix="ttv_")
+        ttv = None
         try:
-            ttv = TextToVideo(text, output_file + ".mp4")
-            ttv.process_video_elements()
-            ttv.save_video()
-            messagebox.showinfo("Success", f"Video saved as '{output_file}.mp4'.")
+            ttv = get_ttv()
+            ttv.work_dir = work_dir
+            ttv.progress_callback = lambda event: self.events.put(("progress", event))
+            ttv.cancel_event = cancel_event
+            run(ttv)
+            self.events.put(("done", ttv))
+        except RenderCancelled:
+            self.events.put(("cancelled", None))
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            self.events.put(("error", str(e)))
+        finally:
+            if ttv is not None:
+                ttv.cleanup()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def poll_events(self):
+        finished = False
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.show_progress(payload)
+                continue
+
+            finished = True
+            self.set_running(False)
+            if kind == "done":
+                self.progress_bar["value"] = 100
+                self.status_label.config(text="Done")
+                if payload.draft:
+                    # Keep the draft so it can be promoted with the same images
+                    self.draft_ttv = payload
+                elif payload is self.draft_ttv:
+                    self.draft_ttv = None
+                self.update_promote_button()
+                messagebox.showinfo("Success", f"Video saved as '{payload.rendered_file}'.")
+            elif kind == "cancelled":
+                self.progress_bar["value"] = 0
+                self.status_label.config(text="Cancelled")
+                # A failed or cancelled promotion leaves the draft in place, so it can be retried
+                self.update_promote_button()
+            else:
+                self.status_label.config(text="Failed")
+                self.update_promote_button()
+                messagebox.showerror("Error", f"An error occurred: {payload}")
+
+        if not finished:
+            self.root.after(POLL_INTERVAL_MS, self.poll_events)
+
+    def show_progress(self, event):
+        self.progress_bar["value"] = event["progress"] * 100
+        if event["stage"] == "encode":
+            status = f"Encoding video ({event.get('stage_progress', 0):.0%})"
+        else:
+            status = f"{STAGE_LABELS.get(event['stage'], event['stage'])} (segment {event.get('segment')})"
+        self.status_label.config(text=status)
+
+    def cancel(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.status_label.config(text="Cancelling...")
+
+    def update_promote_button(self):
+        self.promote_button.config(state=tk.NORMAL if self.draft_ttv is not None else tk.DISABLED)
+
+    def set_running(self, running):
+        self.convert_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.select_file_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.draft_check.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.profile_box.config(state=tk.DISABLED if running else "readonly")
+        if running:
+            self.promote_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+
+    def on_close(self):
+        if self.worker is not None and self.worker.is_alive():
+            self.cancel()
+            self.worker.join(timeout=5)
+        self.root.destroy()
 
 
 def main():
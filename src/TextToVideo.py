@@ -1,8 +1,12 @@
 import sys
 import os
 import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
@@ -15,27 +19,78 @@ from src.image.image_grabber import ImageGrabber
 from src.text.text_processor import TextProcessor
 from src.audio.audio import WaveNetTTS
 from src.video.video_segment import VideoSegment
+from src.video.scheduler import SegmentScheduler
+from src.video.progress import EncodeProgressLogger
+from src.video.encoder_profiles import DRAFT_PROFILE, audio_extension, get_profile, write_options
+from src.utils.common import RenderCancelled, check_cancelled
+from src.cluster.coordinator import concat_segments
+from src.cluster.task_queue import TaskQueue
+from src.utils.cache_manager import get_cache_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
 class TextToVideo:
-    def __init__(self, text: str, output_file: str, segment_length: int = 100, image_size: tuple = (1920, 1080)):
+    # Share of the overall progress spent building segments; encoding takes the rest
+    SEGMENTS_WEIGHT = 0.7
+    SEGMENT_STAGES = ("images", "audio", "compose")
+
+    # Segments are mostly network-bound (search, downloads, gTTS), so threads overlap well
+    DEFAULT_WORKERS = 4
+    # Draft renders trade quality for speed: small frames from cached proxies, encoded with the draft profile
+    DRAFT_SIZE = (854, 480)
+
+    def __init__(self, text: str, output_file: str, segment_length: int = 100, image_size: tuple = (1920, 1080),
+                 image_grabber: Optional[ImageGrabber] = None, tts: Optional[WaveNetTTS] = None,
+                 work_dir: str = "downloads", progress_callback: Optional[Callable[[Dict], None]] = None,
+                 cancel_event=None, draft: bool = False, segment_images: Optional[Dict[int, List[str]]] = None,
+                 workers: int = DEFAULT_WORKERS, profile: Optional[str] = None):
         self.text = text
         self.output_file = output_file
+        self.run_id = uuid.uuid4().hex
+        self.draft = draft
+        # Encoder profile of full-quality renders; drafts always use the draft profile
+        self.profile = profile
+        # Fail on an unknown profile name before any searching or TTS
+        full_profile = get_profile(profile)
+        # Resolved once, so every segment and the final encode use the same settings
+        # even if the profiles file changes during the render
+        self.encoder_profile: Dict = get_profile(DRAFT_PROFILE) if draft else full_profile
+        # Source images chosen per segment number; reused when a draft is promoted
+        self.segment_images: Dict[int, List[str]] = {int(k): v for k, v in (segment_images or {}).items()}
+        self._segments: Optional[List[Dict]] = None
         self.video_segments: List[VideoClip] = []
+        self.segment_objects: List[VideoSegment] = []
         self.segment_length = segment_length
         self.image_size = image_size
+        self.work_dir = work_dir
+        self.progress_callback = progress_callback
+        self.workers = max(1, workers)
+        self._reported_percent = None
+        self._progress_lock = threading.Lock()
         
-        # Initialize components
-        self.image_grabber = ImageGrabber(resize=True, size=image_size)
-        self.tts = WaveNetTTS()
+        # Initialize components, reusing long-lived ones (and their caches) when given
+        self.image_grabber = image_grabber or ImageGrabber(resize=True, size=image_size)
+        self.tts = tts or WaveNetTTS()
+        self.cancel_event = cancel_event
         self.text_processor = TextProcessor()
         
         # Ensure NLTK data is downloaded
         self._download_nltk_data()
 
+    @property
+    def cancel_event(self):
+        return self._cancel_event
+
+    @cancel_event.setter
+    def cancel_event(self, event) -> None:
+        # Downloads and TTS check the event themselves so they can stop mid-transfer
+        self._cancel_event = event
+        self.image_grabber.cancel_event = event
+        self.tts.cancel_event = event
+
     @staticmethod
     def _download_nltk_data():
         try:
@@ -45,6 +100,28 @@ class TextToVideo:
             nltk.download('punkt', quiet=True)
             nltk.download('stopwords', quiet=True)
 
+    def _report_progress(self, stage: str, progress: float, **details) -> None:
+        """
+        Send a progress event to progress_callback.
+
+        Args:
+            stage (str): "images", "audio", "compose" or "encode"; distributed renders
+                report "segments" while nodes render and "join" while the files are joined.
+            progress (float): Overall progress of the render, from 0 to 1.
+            **details: Extra event fields, e.g. segment number or stage_progress.
+        """
+        if self.progress_callback is None:
+            return
+        # Encode reports every frame; only forward whole-percent changes
+        percent = (stage, details.get("segment"), int(progress * 100))
+        if percent == self._reported_percent:
+            return
+        self._reported_percent = percent
+        try:
+            self.progress_callback({"stage": stage, "progress": progress, **details})
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {str(e)}")
+
     def _extract_keywords(self, text: str, num_keywords: int = 3) -> List[str]:
         stop_words = set(stopwords.words('english'))
         word_tokens = word_tokenize(text.lower())
@@ -53,7 +130,21 @@ class TextToVideo:
         freq_dist = nltk.FreqDist(filtered_tokens)
         return [word for word, _ in freq_dist.most_common(num_keywords)]
 
+    @property
+    def preview_file(self) -> str:
+        path = Path(self.output_file)
+        return str(path.with_name(f"{path.stem}_draft{path.suffix}"))
+
+    @property
+    def rendered_file(self) -> str:
+        """Path the current mode renders to: preview_file for drafts, output_file otherwise."""
+        return self.preview_file if self.draft else self.output_file
+
     def _create_segments(self) -> List[Dict]:
+        # The text processor accumulates segments, so parse the script only once per instance
+        if self._segments is not None:
+            return self._segments
+
         self.text_processor.process_text(self.text)
         segments = self.text_processor.get_video_segments()
         processed_segments = []
@@ -65,41 +156,132 @@ class TextToVideo:
                 "voiceover_text": segment.voiceover_text,
                 "image_keyword": segment.image_keyword or " ".join(keywords),
                 "segment_number": i,
-                "images_number": segment.images_number
+                "images_number": segment.images_number,
+                "transition": segment.transition,
+                "transition_duration": segment.transition_duration,
+                "motion": segment.motion
             })
 
+        self._segments = processed_segments
         return processed_segments
 
+    def _generate_segment(self, segment: Dict, download_folder: Path, stages_done: Dict[int, float], abort: threading.Event):
+        segment_count = len(stages_done)
+
+        def on_stage(stage: str) -> None:
+            check_cancelled(self.cancel_event)
+            check_cancelled(abort)
+            with self._progress_lock:
+                stages_done[segment['segment_number']] = self.SEGMENT_STAGES.index(stage) / len(self.SEGMENT_STAGES)
+                done = sum(stages_done.values())
+                self._report_progress(stage, self.SEGMENTS_WEIGHT * done / segment_count, segment=segment['segment_number'])
+
+        video_segment = VideoSegment(**segment)
+        video_clip = video_segment.generate_segment(
+            self.tts, 
+            self.image_grabber, 
+            str(download_folder), 
+            self.DRAFT_SIZE if self.draft else self.image_size,
+            on_stage=on_stage,
+            fps=self.encoder_profile["fps"],
+            images=self.segment_images.get(segment['segment_number'])
+        )
+        if video_segment.audio_path:
+            # Only needed until the video is encoded; removed by cleanup()
+            get_cache_manager().track(video_segment.audio_path, "temp", run_id=self.run_id)
+        with self._progress_lock:
+            stages_done[segment['segment_number']] = 1.0
+        logger.info(f"Processed segment {segment['segment_number']}")
+        return video_segment, video_clip
+
     def process_video_elements(self):
         segments = self._create_segments()
-        download_folder = Path("downloads")
-        download_folder.mkdir(exist_ok=True)
+        download_folder = Path(self.work_dir)
+        download_folder.mkdir(parents=True, exist_ok=True)
+
+        # Start the most expensive segments first, then assemble in script order
+        ordered = SegmentScheduler(self.image_grabber, self.tts).order(segments)
+        stages_done = {segment['segment_number']: 0.0 for segment in segments}
+        abort = threading.Event()
+        results = {}
 
-        for segment in segments:
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._generate_segment, segment, download_folder, stages_done, abort): segment
+                for segment in ordered
+            }
             try:
-                video_segment = VideoSegment(**segment)
-                video_clip = video_segment.generate_segment(
-                    self.tts, 
-                    self.image_grabber, 
-                    str(download_folder), 
-                    self.image_size
-                )
-                self.video_segments.append(video_clip)
-                logger.info(f"Processed segment {segment['segment_number']}")
+                for future in as_completed(futures):
+                    segment = futures[future]
+                    results[segment['segment_number']] = future.result()
+            except RenderCancelled:
+                logger.info(f"Cancelled during segment {segment['segment_number']}")
+                abort.set()
+                for pending in futures:
+                    pending.cancel()
+                raise
             except Exception as e:
                 logger.error(f"Error generating video segment {segment['segment_number']}: {str(e)}")
+                # Stop the other segments at their next stage instead of finishing them
+                abort.set()
+                for pending in futures:
+                    pending.cancel()
                 raise
 
+        for segment_number in sorted(results):
+            video_segment, video_clip = results[segment_number]
+            self.segment_images[segment_number] = video_segment.images
+            self.segment_objects.append(video_segment)
+            self.video_segments.append(video_clip)
+
+        self._link_transitions()
+
+    def _link_transitions(self) -> None:
+        # A crossfade segment also fades its last image into the next segment's first one
+        for current, following in zip(self.segment_objects, self.segment_objects[1:]):
+            if current.transition == "crossfade" and following.slideshow is not None:
+                current.slideshow.fade_into(following.slideshow, current.transition_duration)
+
+    def _on_encode_progress(self, fraction: float) -> None:
+        check_cancelled(self.cancel_event)
+        progress = self.SEGMENTS_WEIGHT + (1 - self.SEGMENTS_WEIGHT) * fraction
+        self._report_progress("encode", progress, stage_progress=fraction)
+
+    def _temp_audiofile(self) -> str:
+        extension = audio_extension(self.encoder_profile)
+        return os.path.join(self.work_dir, f"{Path(self.rendered_file).stem}_audio.{extension}")
+
+    def _discard_partial_output(self) -> None:
+        for path in (self.rendered_file, self._temp_audiofile()):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove partial output {path}: {str(e)}")
+
     def save_video(self):
         if not self.video_segments:
             raise ValueError("No video elements to save.")
 
         try:
-            final_clip = concatenate_videoclips(self.video_segments, method="compose")
-            final_clip.write_videofile(self.output_file, codec='libx264')
-            logger.info(f"Video saved as {self.output_file}")
+            check_cancelled(self.cancel_event)
+            Path(self.work_dir).mkdir(parents=True, exist_ok=True)
+            # Segments share one frame size, so chaining avoids compositing every frame
+            final_clip = concatenate_videoclips(self.video_segments, method="chain")
+            final_clip.write_videofile(
+                self.rendered_file,
+                temp_audiofile=self._temp_audiofile(),
+                logger=EncodeProgressLogger(self._on_encode_progress),
+                **write_options(self.encoder_profile)
+            )
+            logger.info(f"Video saved as {self.rendered_file}")
+        except RenderCancelled:
+            logger.info("Encoding cancelled")
+            self._discard_partial_output()
+            raise
         except Exception as e:
             logger.error(f"Error saving video: {str(e)}")
+            self._discard_partial_output()
             raise
 
     def generate_video(self):
@@ -108,13 +290,124 @@ class TextToVideo:
             self.process_video_elements()
             self.save_video()
             logger.info("Video generation completed successfully")
+        except RenderCancelled:
+            logger.info("Video generation cancelled")
+            raise
         except Exception as e:
             logger.error(f"Video generation failed: {str(e)}")
             raise
 
+    def segment_tasks(self) -> List[Dict]:
+        """
+        Build one render task per segment for distributed rendering.
+
+        Payloads carry everything a render node needs, including the images chosen by an
+        earlier draft so a promoted render shows the same pictures. Costs come from the
+        scheduler, so nodes pick up the slowest segments first.
+
+        Returns:
+            List[Dict]: Tasks with segment_number, payload and cost.
+        """
+        segments = self._create_segments()
+        # Same costs as the local scheduler, so nodes dispatch in the same order
+        costs = SegmentScheduler(self.image_grabber, self.tts).costs(segments)
+        return [
+            {
+                "segment_number": segment["segment_number"],
+                "cost": costs[segment["segment_number"]],
+                "payload": {
+                    "segment": segment,
+                    "image_size": list(self.image_size),
+                    "size": list(self.DRAFT_SIZE if self.draft else self.image_size),
+                    "profile": self.encoder_profile,
+                    "images": self.segment_images.get(segment["segment_number"]),
+                },
+            }
+            for segment in segments
+        ]
+
+    def generate_video_distributed(self, queue: TaskQueue, poll_interval: float = 2.0):
+        """
+        Render segments on the render nodes sharing the queue's directory, then join them.
+
+        Each node renders whole segments to standalone files, so crossfades between
+        segments are not applied; crossfades within a segment are.
+
+        Args:
+            queue (TaskQueue): Queue in the directory shared with the render nodes.
+            poll_interval (float, optional): Seconds between progress checks. Defaults to 2.0.
+        """
+        logger.info(f"Starting distributed video generation for run {self.run_id}")
+        queue.add_run(self.run_id, self.segment_tasks())
+        try:
+            while True:
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    queue.cancel_run(self.run_id)
+                    logger.info("Distributed video generation cancelled")
+                    raise RenderCancelled()
+
+                tasks = queue.run_tasks(self.run_id)
+                failed = [task for task in tasks if task["status"] == TaskQueue.FAILED]
+                if failed:
+                    queue.cancel_run(self.run_id)
+                    raise RuntimeError(f"Segment {failed[0]['segment_number']} failed: {failed[0]['error']}")
+
+                done = sum(task["status"] == TaskQueue.DONE for task in tasks)
+                # Nodes encode as they render, so joining the files is the only step left after them
+                self._report_progress("segments", done / (len(tasks) + 1), segments_done=done,
+                                      segments_total=len(tasks))
+                if done == len(tasks):
+                    break
+                time.sleep(poll_interval)
+
+            run_dir = queue.run_dir(self.run_id)
+            for task in tasks:
+                self.segment_images[task["segment_number"]] = task["result"]["images"]
+            self._report_progress("join", len(tasks) / (len(tasks) + 1))
+            concat_segments([os.path.join(run_dir, task["result"]["output_file"]) for task in tasks], self.rendered_file)
+            self._report_progress("join", 1.0)
+            logger.info(f"Video saved as {self.rendered_file}")
+        finally:
+            queue.delete_run(self.run_id)
+
+    def promote(self, output_file: Optional[str] = None):
+        """
+        Re-render a finished draft at full quality.
+
+        The same segments and image choices are reused, and search and TTS results
+        come from the caches the draft filled, so only resizing and encoding are redone.
+
+        Args:
+            output_file (Optional[str], optional): Full-quality output path. Defaults to output_file.
+        """
+        if not self.draft:
+            raise ValueError("Only a draft render can be promoted.")
+        draft_profile = self.encoder_profile
+        self.encoder_profile = get_profile(self.profile)
+        self.draft = False
+        self.output_file = output_file or self.output_file
+        self.video_segments = []
+        self.segment_objects = []
+        self._reported_percent = None
+        try:
+            self.generate_video()
+        except Exception:
+            # Stay a draft so the promotion can be retried
+            self.draft = True
+            self.encoder_profile = draft_profile
+            raise
+
     def cleanup(self):
-        # Add any cleanup operations here, e.g., deleting temporary files
-        pass
+        """
+        Remove this run's temporary files and evict the caches back under their quotas.
+        """
+        try:
+            cache_manager = get_cache_manager()
+            removed = cache_manager.cleanup_run(self.run_id)
+            freed = cache_manager.enforce()
+            logger.info(f"Removed {removed} temporary files, evicted {freed / (1024 * 1024):.1f} MB from caches")
+        except Exception as e:
+            logger.warning(f"Cache cleanup failed: {str(e)}")
 
 if __name__ == "__main__":
     # Example usage
@@ -1,5 +1,182 @@
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 from src.instance import config
+from src.api.jobs import JobQueue, QueueFullError
+from src.api.worker import WorkerPool
+from src.video.encoder_profiles import load_profiles
+
+logger = logging.getLogger(__name__)
+
+# TextToVideo keyword arguments clients may set per job, with their expected type
+JOB_OPTIONS = {
+    "draft": bool,
+    "profile": str,
+}
+
+RETRY_AFTER_SECONDS = 30
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP interface to the job queue.
+
+    POST /jobs                submit a script, returns the job id
+    POST /jobs/<id>/promote   re-render a finished draft at full quality as a new job
+    GET  /jobs                list recent jobs
+    GET  /jobs/<id>           job status and progress
+    GET  /jobs/<id>/result    download the rendered video
+    """
+
+    server_version = "TTV"
+    queue: JobQueue = None
+    max_script_bytes = 1024 * 1024
+
+    def _send_json(self, status: int, payload, headers: dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str, headers: dict = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    @staticmethod
+    def _public(job: dict) -> dict:
+        return {key: job[key] for key in ("id", "status", "stage", "progress", "error", "created_at", "started_at", "finished_at")}
+
+    def _read_submission(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            raise ValueError("Request body is empty.")
+        if length > self.max_script_bytes:
+            raise ValueError(f"Request body exceeds {self.max_script_bytes} bytes.")
+        body = self.rfile.read(length).decode("utf-8")
+
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            payload = json.loads(body)
+            script = payload.get("script", "")
+            options = payload.get("options", {})
+        else:
+            script, options = body, {}
+
+        if not isinstance(script, str) or not script.strip():
+            raise ValueError("Script is empty.")
+        for key, value in options.items():
+            # Exact type check: bool is a subclass of int
+            if key not in JOB_OPTIONS or type(value) is not JOB_OPTIONS[key]:
+                raise ValueError(f"Invalid option: {key}")
+        if "profile" in options and options["profile"] not in load_profiles():
+            raise ValueError(f"Unknown encoder profile: {options['profile']}")
+        return script, options
+
+    def _promote_submission(self, job_id: str):
+        job = self.queue.get(job_id)
+        if job is None:
+            raise LookupError("Unknown job.")
+        if job["status"] != JobQueue.DONE or not job["options"].get("draft"):
+            raise ValueError("Only a finished draft job can be promoted.")
+        # Same script and image choices; search and TTS results come from the workers' caches
+        options = dict(job["options"], draft=False, segment_images=job["segment_images"])
+        return job["script"], options
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        promote = re.fullmatch(r"/jobs/([0-9a-f]{32})/promote", path)
+        if path != "/jobs" and not promote:
+            self._send_error(404, "Not found.")
+            return
+        try:
+            if promote:
+                script, options = self._promote_submission(promote.group(1))
+            else:
+                script, options = self._read_submission()
+        except LookupError as e:
+            self._send_error(404, str(e))
+            return
+        except (ValueError, AttributeError) as e:
+            self._send_error(400 if not promote else 409, str(e))
+            return
+
+        try:
+            job_id = self.queue.submit(script, options)
+        except QueueFullError:
+            self._send_error(503, "Job queue is full, retry later.", {"Retry-After": str(RETRY_AFTER_SECONDS)})
+            return
+        self._send_json(202, {"id": job_id, "status": JobQueue.QUEUED}, {"Location": f"/jobs/{job_id}"})
+
+    def do_GET(self):
+        path = self.path.rstrip("/")
+        if path == "/jobs":
+            self._send_json(200, [self._public(job) for job in self.queue.list_jobs()])
+            return
+
+        match = re.fullmatch(r"/jobs/([0-9a-f]{32})(/result)?", path)
+        if not match:
+            self._send_error(404, "Not found.")
+            return
+
+        job = self.queue.get(match.group(1))
+        if job is None:
+            self._send_error(404, "Unknown job.")
+            return
+        if not match.group(2):
+            self._send_json(200, self._public(job))
+            return
+
+        if job["status"] != JobQueue.DONE or not os.path.isfile(job["output_file"] or ""):
+            self._send_error(409, f"Job is {job['status']}, no result available.")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(os.path.getsize(job["output_file"])))
+        self.send_header("Content-Disposition", f'attachment; filename="{job["id"]}.mp4"')
+        self.end_headers()
+        with open(job["output_file"], "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
 
 def main():
-    print("imported")
-    config.config()
\ No newline at end of file
+    settings = config.config()
+    parser = argparse.ArgumentParser(description="Run the TTV render job API.")
+    parser.add_argument("--host", type=str, default=settings["API_HOST"], help="Address to bind")
+    parser.add_argument("--port", type=int, default=settings["API_PORT"], help="Port to bind")
+    parser.add_argument("--workers", type=int, default=settings["WORKERS"], help="Number of render worker processes")
+    parser.add_argument("--max-queued", type=int, default=settings["MAX_QUEUED_JOBS"], help="Queued jobs accepted before rejecting submissions")
+    parser.add_argument("--db", type=str, default=settings["JOBS_DB"], help="Job queue database file")
+    parser.add_argument("--output", type=str, default=settings["OUTPUT_DIRECTORY"], help="Directory for rendered videos")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    JobRequestHandler.queue = JobQueue(args.db, max_queued=args.max_queued)
+    JobRequestHandler.max_script_bytes = settings["MAX_SCRIPT_BYTES"]
+
+    pool = WorkerPool(args.db, args.output, workers=args.workers)
+    pool.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), JobRequestHandler)
+    logger.info(f"Serving job API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
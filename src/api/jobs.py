@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobQueue:
+    """
+    Persistent render job queue backed by SQLite.
+
+    The database is shared between the API process and the worker processes, so
+    every method opens its own short-lived connection.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            script TEXT NOT NULL,
+            options TEXT NOT NULL DEFAULT '{}',
+            output_file TEXT,
+            segment_images TEXT,
+            stage TEXT,
+            progress REAL NOT NULL DEFAULT 0,
+            error TEXT,
+            worker TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        )
+    """
+
+    def __init__(self, db_path: str = "jobs.db", max_queued: int = 20):
+        """
+        Initialize the job queue.
+
+        Args:
+            db_path (str, optional): SQLite database file. Defaults to "jobs.db".
+            max_queued (int, optional): Queued jobs accepted before submit() refuses more. Defaults to 20.
+        """
+        self.db_path = db_path
+        self.max_queued = max_queued
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["segment_images"] = json.loads(job["segment_images"] or "{}")
+        return job
+
+    def submit(self, script: str, options: Optional[Dict] = None) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            script (str): Script text to render.
+            options (Optional[Dict], optional): Extra TextToVideo options for the job.
+
+        Returns:
+            str: The new job id.
+
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting.
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (queued,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (self.QUEUED,)).fetchone()
+                if queued >= self.max_queued:
+                    raise QueueFullError(f"{queued} jobs already queued")
+                conn.execute(
+                    "INSERT INTO jobs (id, status, script, options, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, self.QUEUED, script, json.dumps(options or {}), time.time()),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Queued job {job_id}")
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """
+        Atomically take the oldest queued job and mark it as running.
+
+        Args:
+            worker (str): Name of the claiming worker.
+
+        Returns:
+            Optional[Dict]: The claimed job, or None if the queue is empty.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (self.QUEUED,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ? WHERE id = ?",
+                    (self.RUNNING, worker, time.time(), row["id"]),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = self._to_dict(row)
+        job.update(status=self.RUNNING, worker=worker)
+        return job
+
+    def update_progress(self, job_id: str, stage: str, progress: float) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET stage = ?, progress = ? WHERE id = ?", (stage, progress, job_id))
+
+    def complete(self, job_id: str, output_file: str, segment_images: Optional[Dict] = None) -> None:
+        """
+        Mark a job as done.
+
+        Args:
+            job_id (str): Job to complete.
+            output_file (str): Path of the rendered video.
+            segment_images (Optional[Dict], optional): Images chosen per segment, kept so a
+                draft can be promoted with the same images.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, output_file = ?, segment_images = ?, progress = 1, finished_at = ? WHERE id = ?",
+                (self.DONE, output_file, json.dumps(segment_images or {}), time.time(), job_id),
+            )
+        logger.info(f"Job {job_id} done")
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (self.FAILED, error, time.time(), job_id),
+            )
+        logger.info(f"Job {job_id} failed: {error}")
+
+    def fail_worker_jobs(self, worker: str, error: str) -> int:
+        """
+        Fail the jobs a worker was running when it died.
+
+        They are failed rather than requeued, since the job itself (e.g. its memory use)
+        may be what killed the worker.
+
+        Returns:
+            int: Number of jobs failed.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND worker = ?",
+                (self.FAILED, error, time.time(), self.RUNNING, worker),
+            )
+        if cursor.rowcount:
+            logger.info(f"Failed {cursor.rowcount} jobs of worker {worker}: {error}")
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list_jobs(self, limit: int = 50) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def requeue_running(self) -> int:
+        """
+        Put jobs left running by a previous process back in the queue.
+
+        Returns:
+            int: Number of jobs requeued.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, stage = NULL, progress = 0, started_at = NULL WHERE status = ?",
+                (self.QUEUED, self.RUNNING),
+            )
+        if cursor.rowcount:
+            logger.info(f"Requeued {cursor.rowcount} interrupted jobs")
+        return cursor.rowcount
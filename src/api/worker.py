@@ -0,0 +1,156 @@
+import logging
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from contextlib import ExitStack
+from typing import Dict
+
+from src.api.jobs import JobQueue
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0
+MONITOR_INTERVAL = 5.0
+
+
+def _render_job(job: dict, queue: JobQueue, output_dir: str, image_grabber, tts):
+    # Imported here so the API process never loads moviepy/nltk
+    from src.TextToVideo import TextToVideo
+
+    output_file = os.path.abspath(os.path.join(output_dir, f"{job['id']}.mp4"))
+    work_dir = os.path.join("temp", "jobs", job["id"])
+
+    def on_progress(event: dict) -> None:
+        queue.update_progress(job["id"], event["stage"], event["progress"])
+
+    ttv = None
+    try:
+        ttv = TextToVideo(
+            job["script"],
+            output_file,
+            image_grabber=image_grabber,
+            tts=tts,
+            work_dir=work_dir,
+            progress_callback=on_progress,
+            **job["options"],
+        )
+        ttv.generate_video()
+    finally:
+        if ttv is not None:
+            ttv.cleanup()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return ttv.rendered_file, ttv.segment_images
+
+
+def worker_loop(name: str, db_path: str, output_dir: str, stop_event) -> None:
+    """
+    Claim and render jobs until stop_event is set.
+
+    The image grabber, TTS cache and browser are created once per worker and
+    reused for every job it renders.
+
+    Args:
+        name (str): Worker name recorded on claimed jobs.
+        db_path (str): Job queue database.
+        output_dir (str): Directory rendered videos are written to.
+        stop_event: multiprocessing.Event that ends the loop.
+    """
+    from src.audio.audio import WaveNetTTS
+    from src.image.google_crawl import create_webdriver
+    from src.image.image_grabber import ImageGrabber
+
+    queue = JobQueue(db_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ExitStack() as stack:
+        image_grabber = None
+        tts = WaveNetTTS()
+        while not stop_event.is_set():
+            job = queue.claim(name)
+            if job is None:
+                stop_event.wait(POLL_INTERVAL)
+                continue
+
+            if image_grabber is None:
+                wd = stack.enter_context(create_webdriver())
+                image_grabber = ImageGrabber(resize=True, webdriver=wd)
+
+            logger.info(f"{name} rendering job {job['id']}")
+            started = time.time()
+            try:
+                output_file, segment_images = _render_job(job, queue, output_dir, image_grabber, tts)
+                queue.complete(job["id"], output_file, segment_images)
+                logger.info(f"{name} finished job {job['id']} in {time.time() - started:.1f}s")
+            except Exception as e:
+                logger.error(f"{name} failed job {job['id']}: {str(e)}", exc_info=True)
+                queue.fail(job["id"], str(e))
+
+
+class WorkerPool:
+    """
+    Fixed-size pool of render worker processes sharing one JobQueue.
+
+    The pool size is the render concurrency limit; jobs beyond it wait in the queue.
+    A monitor thread replaces workers that die (e.g. killed for running out of
+    memory) and fails the job they were running, so the pool never shrinks.
+    """
+
+    def __init__(self, db_path: str, output_dir: str, workers: int = 2):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.workers = workers
+        self._stop_event = multiprocessing.Event()
+        self._processes: Dict[str, multiprocessing.Process] = {}
+        self._monitor = None
+
+    def _spawn(self, name: str) -> None:
+        process = multiprocessing.Process(
+            target=worker_loop,
+            args=(name, self.db_path, self.output_dir, self._stop_event),
+            daemon=True,
+        )
+        process.start()
+        self._processes[name] = process
+
+    def start(self) -> None:
+        JobQueue(self.db_path).requeue_running()
+        for i in range(self.workers):
+            self._spawn(f"worker-{i + 1}")
+        self._monitor = threading.Thread(target=self._watch, daemon=True)
+        self._monitor.start()
+        logger.info(f"Started {self.workers} render workers")
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(MONITOR_INTERVAL):
+            self.replace_dead_workers()
+
+    def replace_dead_workers(self) -> int:
+        """
+        Restart workers that exited, failing the jobs they were running.
+
+        Returns:
+            int: Number of workers restarted.
+        """
+        restarted = 0
+        queue = JobQueue(self.db_path)
+        for name, process in list(self._processes.items()):
+            if process.is_alive() or self._stop_event.is_set():
+                continue
+            logger.warning(f"Render worker {name} exited with code {process.exitcode}, restarting it")
+            queue.fail_worker_jobs(name, f"Render worker exited unexpectedly (exit code {process.exitcode})")
+            self._spawn(name)
+            restarted += 1
+        return restarted
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop_event.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout)
+        for process in self._processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes.clear()
+        logger.info("Stopped render workers")
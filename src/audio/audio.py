@@ -1,11 +1,15 @@
 import os
 import re
 import logging
-from typing import Tuple
+import threading
+from typing import Optional, Tuple
 from gtts import gTTS
 from mutagen.mp3 import MP3
 from pathlib import Path
 
+from src.utils.common import check_cancelled
+from src.utils.cache_manager import get_cache_manager
+
 # Ensure mkdir function is available in src/utils/common.py
 def mkdir(directory: str) -> None:
     """
@@ -33,6 +37,7 @@ class WaveNetTTS:
         
         self._memory = {}
         self.download_location = download_location
+        self.cancel_event = None
         mkdir(download_location)
         self._load_audio()
 
@@ -64,19 +69,20 @@ class WaveNetTTS:
             Tuple[str, float]: Path to saved file and audio length.
         """
         try:
-            # Sanitize text to create a valid file name
-            safe_text = re.sub(r'\W+', '_', text)
+            safe_text = self._safe_text(text)
 
-            if safe_text in self._memory:
+            # The cache manager may have evicted the file since it was loaded
+            if safe_text in self._memory and os.path.isfile(self._memory[safe_text][0]):
                 self.logger.info(f"Using cached TTS for text: {text}")
+                get_cache_manager().touch([self._memory[safe_text][0]])
                 return self._memory[safe_text]
 
             audio_file = os.path.join(self.download_location, f"{safe_text}.mp3")
 
             if not os.path.isfile(audio_file):
                 self.logger.info(f"Generating new TTS for text: {text}")
-                tts = gTTS(text)
-                tts.save(audio_file)
+                self._save_tts(text, audio_file)
+                get_cache_manager().track(audio_file, "audio")
 
             # Get audio length for video duration
             mp3 = MP3(audio_file)
@@ -86,3 +92,40 @@ class WaveNetTTS:
         except Exception as e:
             self.logger.error(f"Error generating TTS: {str(e)}")
             raise
+
+    @staticmethod
+    def _safe_text(text: str) -> str:
+        # Sanitize text to create a valid file name
+        return re.sub(r'\W+', '_', text)
+
+    def cached_length(self, text: str) -> Optional[float]:
+        """
+        Get the audio length for a text if its TTS is already cached.
+
+        Args:
+            text (str): Text to look up.
+
+        Returns:
+            Optional[float]: Audio length in seconds, or None if not cached.
+        """
+        cached = self._memory.get(self._safe_text(text))
+        return cached[1] if cached and os.path.isfile(cached[0]) else None
+
+    def _save_tts(self, text: str, audio_file: str) -> None:
+        """
+        Stream gTTS output to a partial file and move it into place once complete.
+
+        Checking the cancel event between chunks lets a long voiceover be abandoned
+        without leaving a truncated mp3 that would later be mistaken for a cached one.
+        """
+        # Per-thread name, since segments may generate the same text concurrently
+        partial_file = f"{audio_file}.{threading.get_ident()}.part"
+        try:
+            with open(partial_file, "wb") as f:
+                for chunk in gTTS(text).stream():
+                    check_cancelled(self.cancel_event)
+                    f.write(chunk)
+            os.replace(partial_file, audio_file)
+        finally:
+            if os.path.exists(partial_file):
+                os.remove(partial_file)
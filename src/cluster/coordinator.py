@@ -0,0 +1,74 @@
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.cluster.task_queue import TaskQueue
+
+logger = logging.getLogger(__name__)
+
+
+def concat_segments(files: List[str], output_file: str) -> None:
+    """
+    Join rendered segment files into one video without re-encoding.
+
+    Uses ffmpeg's concat demuxer with stream copy, so the segments must share codec,
+    frame size, fps and audio settings, which render nodes guarantee.
+
+    Args:
+        files (List[str]): Segment videos in playback order.
+        output_file (str): Joined video.
+    """
+    import imageio_ffmpeg
+
+    if not files:
+        raise ValueError("No segment files to join.")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for path in files:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    try:
+        command = [
+            imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", listing.name,
+            "-c", "copy", "-movflags", "+faststart", output_file,
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg concat failed: {result.stderr.strip()}")
+    finally:
+        os.remove(listing.name)
+    logger.info(f"Joined {len(files)} segments into {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a script across the render nodes sharing a directory.")
+    parser.add_argument("script", type=str, help="Script text file")
+    parser.add_argument("output_file", type=str, help="Output video file")
+    parser.add_argument("--shared", type=str, required=True, help="Directory shared with the render nodes")
+    parser.add_argument("--draft", action="store_true", help="Render a low-resolution draft")
+    parser.add_argument("--profile", type=str, default=None, help="Encoder profile of full-quality renders")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from src.TextToVideo import TextToVideo
+
+    with open(args.script, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    ttv = TextToVideo(text, args.output_file, draft=args.draft, profile=args.profile)
+    try:
+        ttv.generate_video_distributed(TaskQueue(args.shared))
+        print(ttv.rendered_file)
+    finally:
+        ttv.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import logging
+import os
+import shutil
+import socket
+import sys
+import threading
+from contextlib import ExitStack
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.cluster.task_queue import TaskQueue
+from src.utils.cache_manager import get_cache_manager
+from src.utils.common import RenderCancelled, check_cancelled
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 120.0
+POLL_INTERVAL = 2.0
+
+
+class LeaseKeeper(threading.Thread):
+    """
+    Renews a task lease in the background while the segment renders.
+
+    If the lease is lost (it expired and the task went to another node, or the run
+    was cancelled) the cancel event is set so the render stops.
+    """
+
+    def __init__(self, queue: TaskQueue, task: Dict, worker: str, lease_seconds: float, cancel_event: threading.Event):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.task = task
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.cancel_event = cancel_event
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
+            if not self.queue.renew(self.task["id"], self.worker, self.lease_seconds):
+                logger.warning(f"Lost lease on task {self.task['id']}, stopping")
+                self.cancel_event.set()
+                return
+
+    def stop(self):
+        self._stopped.set()
+
+
+def render_segment(payload: Dict, image_grabber, tts, work_dir: str, output_file: str, cancel_event=None) -> Dict:
+    """
+    Render one segment task to a standalone video file.
+
+    Args:
+        payload (Dict): Task payload built by TextToVideo.segment_tasks().
+        image_grabber (ImageGrabber): This node's image grabber.
+        tts (WaveNetTTS): This node's TTS.
+        work_dir (str): Folder for temporary files.
+        output_file (str): Final path of the segment video.
+        cancel_event (optional): Event that stops the render.
+
+    Returns:
+        Dict: Task result with the output file and the images used.
+    """
+    from src.video.encoder_profiles import audio_extension, write_options
+    from src.video.progress import EncodeProgressLogger
+    from src.video.video_segment import VideoSegment
+
+    # Segment files are joined without re-encoding, so every node encodes with the run's profile
+    profile = payload["profile"]
+    video_segment = VideoSegment(**payload["segment"])
+    clip = video_segment.generate_segment(
+        tts,
+        image_grabber,
+        work_dir,
+        tuple(payload["size"]),
+        on_stage=lambda stage: check_cancelled(cancel_event),
+        fps=profile["fps"],
+        images=payload.get("images")
+    )
+
+    # moviepy picks the container from the extension, so keep .mp4 last
+    partial_file = f"{os.path.splitext(output_file)[0]}.{socket.gethostname()}.{os.getpid()}.part.mp4"
+    try:
+        clip.write_videofile(
+            partial_file,
+            temp_audiofile=os.path.join(work_dir, f"segment_audio.{audio_extension(profile)}"),
+            logger=EncodeProgressLogger(lambda fraction: check_cancelled(cancel_event)),
+            **write_options(profile)
+        )
+        os.replace(partial_file, output_file)
+    finally:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+    return {"output_file": os.path.basename(output_file), "images": video_segment.images}
+
+
+def enforce_cache_quotas() -> None:
+    """
+    Evict this node's download, audio and temp caches back under their quotas.
+
+    Nodes live much longer than a single render, so they do this after every task
+    instead of once per run like TextToVideo.cleanup().
+    """
+    try:
+        freed = get_cache_manager().enforce()
+        if freed:
+            logger.info(f"Evicted {freed / (1024 * 1024):.1f} MB from caches")
+    except Exception as e:
+        logger.warning(f"Cache cleanup failed: {str(e)}")
+
+
+def run_node(shared_dir: str, name: str, lease_seconds: float = LEASE_SECONDS, poll_interval: float = POLL_INTERVAL,
+             stop_event: Optional[threading.Event] = None) -> None:
+    """
+    Claim and render segment tasks from the shared queue until stop_event is set.
+
+    The image grabber and TTS are kept for the life of the node, so segments reuse
+    whatever this node has already downloaded; the caches are evicted back under
+    their quotas after every task.
+
+    Args:
+        shared_dir (str): Directory shared with the coordinator.
+        name (str): Node name recorded on leases.
+        lease_seconds (float, optional): Lease length, renewed every third of it.
+        poll_interval (float, optional): Wait between claims when the queue is empty.
+        stop_event (Optional[threading.Event], optional): Event that ends the loop.
+    """
+    from src.audio.audio import WaveNetTTS
+    from src.image.google_crawl import create_webdriver
+    from src.image.image_grabber import ImageGrabber
+
+    queue = TaskQueue(shared_dir)
+    stop_event = stop_event or threading.Event()
+    logger.info(f"Render node {name} polling {shared_dir}")
+
+    with ExitStack() as stack:
+        wd = None
+        tts = WaveNetTTS()
+        # Runs may ask for different image sizes; the browser is shared between them
+        image_grabbers = {}
+        while not stop_event.is_set():
+            task = queue.claim(name, lease_seconds)
+            if task is None:
+                stop_event.wait(poll_interval)
+                continue
+
+            payload = task["payload"]
+            image_size = tuple(payload["image_size"])
+            if image_size not in image_grabbers:
+                if wd is None:
+                    wd = stack.enter_context(create_webdriver())
+                image_grabbers[image_size] = ImageGrabber(resize=True, size=image_size, webdriver=wd)
+            image_grabber = image_grabbers[image_size]
+
+            cancel_event = threading.Event()
+            image_grabber.cancel_event = cancel_event
+            tts.cancel_event = cancel_event
+            keeper = LeaseKeeper(queue, task, name, lease_seconds, cancel_event)
+            keeper.start()
+
+            work_dir = os.path.join("temp", "segments", f"{task['run_id']}_{task['segment_number']}")
+            os.makedirs(work_dir, exist_ok=True)
+            output_file = os.path.join(queue.run_dir(task["run_id"]), f"segment_{task['segment_number']:04d}.mp4")
+            logger.info(f"{name} rendering segment {task['segment_number']} of run {task['run_id']} "
+                        f"(attempt {task['attempts']})")
+            try:
+                result = render_segment(payload, image_grabber, tts, work_dir, output_file, cancel_event)
+                if not queue.complete(task["id"], name, result):
+                    logger.warning(f"Lease on task {task['id']} was lost, discarding result")
+            except RenderCancelled:
+                logger.info(f"{name} stopped segment {task['segment_number']} of run {task['run_id']}")
+            except Exception as e:
+                logger.error(f"{name} failed segment {task['segment_number']}: {str(e)}", exc_info=True)
+                queue.fail(task["id"], name, str(e))
+            finally:
+                keeper.stop()
+                shutil.rmtree(work_dir, ignore_errors=True)
+                enforce_cache_quotas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render segment tasks from a shared TTV queue.")
+    parser.add_argument("--shared", type=str, required=True, help="Directory shared with the coordinator")
+    parser.add_argument("--name", type=str, default=f"{socket.gethostname()}-{os.getpid()}", help="Node name")
+    parser.add_argument("--lease", type=float, default=LEASE_SECONDS, help="Lease length in seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        run_node(args.shared, args.name, lease_seconds=args.lease)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """
+    Segment task queue with leases, stored as plain files in a directory shared by all render nodes.
+
+    A node claims a task by taking a lease on it and must renew the lease while it
+    renders. A task whose lease expires, because its node died or stalled, is
+    handed to the next node that asks, up to max_attempts times.
+
+    Every state change that must happen once (a claim, finishing or failing a task)
+    creates a new file with os.link, which fails if the file exists and is atomic on
+    local filesystems and NFS alike, so no file locking is needed. Lease expiry uses
+    each node's clock, so nodes need synchronized clocks (e.g. NTP).
+
+    Layout of runs/<run_id>/tasks/:
+        0001.task       segment payload and cost, written once by add_run
+        0001.2.lease    lease of attempt 2: worker, expiry and the error of a failed attempt
+        0001.done       result of the finished segment
+        0001.failed     error of a segment that used up its attempts
+    A CANCELLED file next to tasks/ cancels the whole run.
+    """
+
+    QUEUED = "queued"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    LEASE_FILE = re.compile(r"(\d+)\.(\d+)\.lease$")
+
+    def __init__(self, shared_dir: str, max_attempts: int = 3):
+        """
+        Initialize the task queue.
+
+        Args:
+            shared_dir (str): Directory shared by the coordinator and all nodes.
+            max_attempts (int, optional): Claims allowed per task before it fails. Defaults to 3.
+        """
+        self.shared_dir = shared_dir
+        self.max_attempts = max_attempts
+        self.runs_dir = os.path.join(shared_dir, "runs")
+        os.makedirs(self.runs_dir, exist_ok=True)
+
+    def run_dir(self, run_id: str) -> str:
+        return os.path.join(self.runs_dir, run_id)
+
+    def _tasks_dir(self, run_id: str) -> str:
+        return os.path.join(self.run_dir(run_id), "tasks")
+
+    @staticmethod
+    def _task_id(run_id: str, segment_number: int) -> str:
+        return f"{run_id}/{segment_number}"
+
+    @staticmethod
+    def _parse_task_id(task_id: str) -> Tuple[str, int]:
+        run_id, segment_number = task_id.rsplit("/", 1)
+        return run_id, int(segment_number)
+
+    @staticmethod
+    def _temp_path(path: str) -> str:
+        # Unique per writer, and not matched by any of the state file names
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    @classmethod
+    def _write(cls, path: str, data: Dict) -> None:
+        temp_path = cls._temp_path(path)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def _create(cls, path: str, data: Dict) -> bool:
+        """
+        Create a file with complete contents, only if it does not exist yet.
+
+        Returns:
+            bool: False if another node created it first.
+        """
+        temp_path = cls._temp_path(path)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        try:
+            os.link(temp_path, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(temp_path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def add_run(self, run_id: str, tasks: List[Dict]) -> None:
+        """
+        Queue the segment tasks of a run.
+
+        Args:
+            run_id (str): Run the tasks belong to.
+            tasks (List[Dict]): Dicts with segment_number, payload and cost; higher cost is claimed first.
+        """
+        tasks_dir = self._tasks_dir(run_id)
+        os.makedirs(tasks_dir, exist_ok=True)
+        created = time.time()
+        for task in tasks:
+            self._write(
+                os.path.join(tasks_dir, f"{task['segment_number']:04d}.task"),
+                {"payload": task["payload"], "cost": task["cost"], "created": created},
+            )
+        logger.info(f"Queued {len(tasks)} segment tasks for run {run_id}")
+
+    def _scan(self, run_id: str) -> List[Dict]:
+        tasks_dir = self._tasks_dir(run_id)
+        try:
+            names = set(os.listdir(tasks_dir))
+        except FileNotFoundError:
+            return []
+        cancelled = os.path.exists(os.path.join(self.run_dir(run_id), "CANCELLED"))
+        attempts = {}
+        for name in names:
+            match = self.LEASE_FILE.match(name)
+            if match:
+                segment_number, attempt = int(match.group(1)), int(match.group(2))
+                attempts[segment_number] = max(attempts.get(segment_number, 0), attempt)
+
+        now = time.time()
+        tasks = []
+        for name in sorted(names):
+            if not name.endswith(".task"):
+                continue
+            segment_number = int(name[:-len(".task")])
+            spec = self._read(os.path.join(tasks_dir, name))
+            if spec is None:
+                continue
+            attempt = attempts.get(segment_number, 0)
+            lease = self._read(os.path.join(tasks_dir, f"{segment_number:04d}.{attempt}.lease")) if attempt else None
+            lease = lease or {}
+            task = {
+                "id": self._task_id(run_id, segment_number),
+                "run_id": run_id,
+                "segment_number": segment_number,
+                "payload": spec["payload"],
+                "cost": spec["cost"],
+                "created": spec["created"],
+                "worker": lease.get("worker"),
+                "lease_expires": lease.get("expires"),
+                "attempts": attempt,
+                "result": None,
+                "error": lease.get("error"),
+            }
+            prefix = os.path.join(tasks_dir, f"{segment_number:04d}")
+            if f"{segment_number:04d}.done" in names:
+                task["status"] = self.DONE
+                task["result"] = self._read(f"{prefix}.done")
+            elif f"{segment_number:04d}.failed" in names:
+                task["status"] = self.FAILED
+                task["error"] = (self._read(f"{prefix}.failed") or {}).get("error")
+            elif cancelled:
+                task["status"] = self.CANCELLED
+            elif lease and lease["expires"] > now:
+                task["status"] = self.LEASED
+            else:
+                # Never claimed, released after an error, or its node stopped renewing
+                task["status"] = self.QUEUED
+            tasks.append(task)
+        return tasks
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Lease the most expensive available task: a queued one, or one whose lease expired.
+
+        Args:
+            worker (str): Name of the claiming node.
+            lease_seconds (float): Lease length; the node must renew before it runs out.
+
+        Returns:
+            Optional[Dict]: The leased task, or None if there is nothing to do.
+        """
+        available = []
+        for run_id in os.listdir(self.runs_dir):
+            for task in self._scan(run_id):
+                if task["status"] != self.QUEUED:
+                    continue
+                if task["attempts"] >= self.max_attempts:
+                    # Tasks whose node died are failed for good once they used up their attempts
+                    self._create(self._state_path(task, "failed"),
+                                 {"error": task["error"] or "Lease expired too many times"})
+                    continue
+                available.append(task)
+
+        available.sort(key=lambda task: (-task["cost"], task["created"], task["segment_number"]))
+        for task in available:
+            attempt = task["attempts"] + 1
+            expires = time.time() + lease_seconds
+            lease_path = os.path.join(self._tasks_dir(task["run_id"]), f"{task['segment_number']:04d}.{attempt}.lease")
+            # Only one node can create the lease file of the next attempt
+            if not self._create(lease_path, {"worker": worker, "expires": expires}):
+                continue
+            if task["attempts"]:
+                logger.warning(f"Lease of {task['worker']} on task {task['id']} expired or was released, re-dispatching")
+            task.update(status=self.LEASED, worker=worker, lease_expires=expires, attempts=attempt, error=None)
+            return task
+        return None
+
+    def _state_path(self, task: Dict, state: str) -> str:
+        return os.path.join(self._tasks_dir(task["run_id"]), f"{task['segment_number']:04d}.{state}")
+
+    def _held_lease(self, task_id: str, worker: str) -> Optional[Tuple[Dict, str, Dict]]:
+        # The lease a worker holds: the latest attempt of an unfinished task, taken by that worker
+        run_id, segment_number = self._parse_task_id(task_id)
+        task = next((task for task in self._scan(run_id) if task["segment_number"] == segment_number), None)
+        if task is None or task["status"] not in (self.LEASED, self.QUEUED) or task["worker"] != worker:
+            return None
+        lease_path = os.path.join(self._tasks_dir(run_id), f"{segment_number:04d}.{task['attempts']}.lease")
+        lease = self._read(lease_path)
+        if lease is None or lease.get("error"):
+            return None
+        return task, lease_path, lease
+
+    def renew(self, task_id: str, worker: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease.
+
+        Returns:
+            bool: False if the node no longer holds the lease (expired and re-dispatched,
+            or the run was cancelled) and should stop rendering.
+        """
+        held = self._held_lease(task_id, worker)
+        if held is None:
+            return False
+        _, lease_path, lease = held
+        self._write(lease_path, dict(lease, expires=time.time() + lease_seconds))
+        return True
+
+    def complete(self, task_id: str, worker: str, result: Dict) -> bool:
+        """
+        Record a rendered segment.
+
+        Returns:
+            bool: False if the lease was lost meanwhile, in which case the result is discarded.
+        """
+        held = self._held_lease(task_id, worker)
+        if held is None:
+            return False
+        return self._create(self._state_path(held[0], "done"), result)
+
+    def fail(self, task_id: str, worker: str, error: str) -> None:
+        """
+        Give a task back after an error, or fail it for good once it used up its attempts.
+        """
+        held = self._held_lease(task_id, worker)
+        if held is None:
+            return
+        task, lease_path, lease = held
+        if task["attempts"] >= self.max_attempts:
+            self._create(self._state_path(task, "failed"), {"error": error})
+        else:
+            self._write(lease_path, dict(lease, expires=0, error=error))
+
+    def cancel_run(self, run_id: str) -> None:
+        if os.path.isdir(self.run_dir(run_id)):
+            self._write(os.path.join(self.run_dir(run_id), "CANCELLED"), {"cancelled": time.time()})
+
+    def run_tasks(self, run_id: str) -> List[Dict]:
+        return self._scan(run_id)
+
+    def delete_run(self, run_id: str) -> None:
+        """Remove a run's tasks and segment files."""
+        shutil.rmtree(self.run_dir(run_id), ignore_errors=True)
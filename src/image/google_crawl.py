@@ -116,7 +116,10 @@ def google_image_search(wd: webdriver.Chrome, query: str, safe: str = "off", n:
     wd.get(search_url)
     return get_images(wd, n=n, out=out)
 
-def run_search(query: str, safe: str, n: int, options: str, out: Optional[str] = None) -> List[str]:
+def run_search(query: str, safe: str, n: int, options: str, out: Optional[str] = None, wd: Optional[webdriver.Chrome] = None) -> List[str]:
+    if wd is not None:
+        # Reuse a long-lived browser instead of paying Chrome startup per search
+        return google_image_search(wd, query, safe=safe, n=n, opts=options, out=out)
     with create_webdriver() as wd:
         return google_image_search(wd, query, safe=safe, n=n, opts=options, out=out)
 
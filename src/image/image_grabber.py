@@ -1,7 +1,9 @@
 import os
+import hashlib
 import requests
-from typing import List, Tuple
-from PIL import Image
+from typing import List, Optional, Tuple
+from PIL import Image, ImageFile
+import threading
 from threading import Lock
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -12,21 +14,44 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 # Import run_search from google_crawl.py
 from src.image.google_crawl import run_search
+from src.utils.common import check_cancelled
+from src.utils.cache_manager import get_cache_manager
 
 logger = logging.getLogger(__name__)
 
 class ImageGrabber:
     IMAGE_FORMAT = "JPEG"
+    ACCEPTED_FORMATS = {"JPEG", "PNG", "WEBP", "BMP", "GIF"}
+    # Types that are never a raster image; anything else (e.g. application/octet-stream
+    # from a CDN) is left to the body sniff
+    REJECTED_CONTENT_TYPES = {
+        "image/svg+xml", "image/x-icon", "image/vnd.microsoft.icon",
+        "application/json", "application/javascript", "application/xml", "application/xhtml+xml", "application/pdf",
+    }
+    REJECTED_CONTENT_TYPE_PREFIXES = ("text/", "audio/", "video/")
+    CHUNK_SIZE = 8 * 1024
 
-    def __init__(self, search_options: str = "", resize: bool = False, size: Tuple[int, int] = (1920, 1080), to_download: int = 20, download_location: str = "downloads", temp_location: str = "temp"):
+    def __init__(self, search_options: str = "", resize: bool = False, size: Tuple[int, int] = (1920, 1080), to_download: int = 20, download_location: str = "downloads", temp_location: str = "temp", max_bytes: int = 8 * 1024 * 1024, sniff_bytes: int = 64 * 1024, search_rounds: int = 3, webdriver=None):
         self._search_options = search_options
         self._resize = resize
         self._size = size
         self.download_folder = download_location
         self.temp_folder = temp_location
         self.to_download = to_download
+        self.max_bytes = max_bytes
+        self.sniff_bytes = sniff_bytes
+        self.search_rounds = search_rounds
+        self.webdriver = webdriver
+        self.cancel_event = None
         self._memory = {}
+        # URLs whose download was rejected, per keyword; never worth fetching again
+        self._rejected_urls = {}
+        # Pixel count of images rejected only for being too small, per keyword and URL
+        self._undersized = {}
         self.lock = Lock()
+        # A shared webdriver can only run one search at a time
+        self._search_lock = Lock()
+        self._keyword_locks = {}
         self._initialize_folders()
         self._load_images()
 
@@ -43,49 +68,201 @@ class ImageGrabber:
             self._memory[keyword] = [os.path.abspath(os.path.join(root, file)) for file in files]
         logger.info(f"Loaded {sum(len(files) for files in self._memory.values())} images from {len(self._memory)} keywords")
 
-    def _download_image(self, url: str, keyword: str) -> str:
+    def _check_headers(self, url: str, headers) -> bool:
+        """
+        Reject a response from its headers alone, before any of the body is read.
+
+        Missing headers are not a reason to reject; the body sniff decides then.
+        """
+        content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type in self.REJECTED_CONTENT_TYPES or content_type.startswith(self.REJECTED_CONTENT_TYPE_PREFIXES):
+            logger.debug(f"Skipping {url}: content type {content_type}")
+            return False
+
+        content_length = headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            logger.debug(f"Skipping {url}: {content_length} bytes exceeds budget of {self.max_bytes}")
+            return False
+        return True
+
+    def _check_image(self, url: str, image: Image.Image, allow_small: bool = False) -> bool:
+        """
+        Reject an image from its sniffed format and pixel dimensions.
+
+        Images smaller than the target size on both axes would have to be upscaled
+        to fill the frame, so they are dropped in favour of a replacement unless
+        allow_small is set.
+        """
+        if image.format not in self.ACCEPTED_FORMATS:
+            logger.debug(f"Skipping {url}: unsupported format {image.format}")
+            return False
+
+        width, height = image.size
+        if not allow_small and width < self._size[0] and height < self._size[1]:
+            logger.debug(f"Skipping {url}: {width}x{height} is below target size {self._size[0]}x{self._size[1]}")
+            return False
+        return True
+
+    def _image_path(self, url: str, keyword: str) -> str:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.download_folder, keyword, f"image_{name}.jpg")
+
+    def _download_image(self, url: str, keyword: str, allow_small: bool = False) -> Optional[str]:
+        """
+        Stream an image, aborting as soon as its headers or first bytes show it is unusable.
+
+        Args:
+            url (str): Image URL returned by the search.
+            keyword (str): Keyword folder to store the image in.
+            allow_small (bool, optional): Accept images below the target size. Defaults to False.
+
+        Returns:
+            Optional[str]: Path to the downloaded image, or None if it was rejected.
+        """
         try:
-            with self.lock:
-                image_count = len(self._memory.get(keyword, [])) + 1
-                download_path = os.path.join(self.download_folder, keyword, f"image_{image_count}.jpg")
-            
-            res = requests.get(url, timeout=10)
-            res.raise_for_status()
-            
+            with requests.get(url, timeout=10, stream=True) as res:
+                res.raise_for_status()
+                if not self._check_headers(url, res.headers):
+                    return None
+
+                parser = ImageFile.Parser()
+                body = bytearray()
+                for chunk in res.iter_content(chunk_size=self.CHUNK_SIZE):
+                    check_cancelled(self.cancel_event)
+                    body.extend(chunk)
+                    if len(body) > self.max_bytes:
+                        logger.debug(f"Skipping {url}: body exceeds budget of {self.max_bytes} bytes")
+                        return None
+
+                    if parser.image is None:
+                        parser.feed(chunk)
+                        if parser.image is not None:
+                            if not self._check_image(url, parser.image, allow_small):
+                                if parser.image.format in self.ACCEPTED_FORMATS:
+                                    # Kept in case no image of the keyword reaches the target size
+                                    width, height = parser.image.size
+                                    with self.lock:
+                                        self._undersized.setdefault(keyword, {})[url] = width * height
+                                return None
+                        elif len(body) >= self.sniff_bytes:
+                            logger.debug(f"Skipping {url}: not a recognizable image after {len(body)} bytes")
+                            return None
+
+                if parser.image is None:
+                    logger.debug(f"Skipping {url}: not a recognizable image")
+                    return None
+
+            download_path = self._image_path(url, keyword)
             os.makedirs(os.path.dirname(download_path), exist_ok=True)
             with open(download_path, "wb") as handler:
-                handler.write(res.content)
-            
+                handler.write(body)
+
             logger.debug(f"Downloaded image from {url} to {download_path}")
-            return download_path
-        except (requests.RequestException, IOError) as e:
+            return os.path.abspath(download_path)
+        except (requests.RequestException, IOError, SyntaxError) as e:
             logger.warning(f"Failed to download image from {url}: {e}")
         return None
 
-    def search_images(self, keyword: str) -> List[str]:
+    def search_images(self, keyword: str, min_images: int = 0) -> List[str]:
+        """
+        Get local image paths for a keyword, searching and downloading them if needed.
+
+        Rejected downloads are replaced by widening the search, for up to
+        ``search_rounds`` searches, until at least ``min_images`` images are usable.
+        If none reaches the target size, the largest smaller ones are used instead.
+
+        Args:
+            keyword (str): Search keyword.
+            min_images (int, optional): Number of usable images wanted. Defaults to 0.
+
+        Returns:
+            List[str]: Paths to the downloaded images.
+        """
+        word = keyword.strip().lower()
+        with self.lock:
+            keyword_lock = self._keyword_locks.setdefault(word, Lock())
+        # Segments running in parallel with the same keyword wait for a single search
+        with keyword_lock:
+            return self._search_images(word, min_images)
+
+    def cached_count(self, keyword: str) -> int:
+        """
+        Get the number of images already on disk for a keyword.
+
+        Args:
+            keyword (str): Search keyword.
+
+        Returns:
+            int: Number of cached images, 0 if the keyword was never searched.
+        """
         word = keyword.strip().lower()
-        if word in self._memory:
+        return sum(1 for path in self._memory.get(word, []) if os.path.isfile(path))
+
+    def _run_search(self, word: str, n: int) -> List[str]:
+        if self.webdriver is None:
+            return run_search(word, "off", n, self._search_options)
+        with self._search_lock:
+            return run_search(word, "off", n, self._search_options, wd=self.webdriver)
+
+    def _search_images(self, word: str, min_images: int) -> List[str]:
+        paths = [path for path in self._memory.get(word, []) if os.path.isfile(path)]
+        if word in self._memory and len(paths) >= min_images:
             logger.info(f"Using cached images for keyword: {word}")
-            return self._memory[word]
-        
+            get_cache_manager().touch(paths)
+            return paths
+
         logger.info(f"Downloading images for keyword: {word}")
-        urls = run_search(word, "off", self.to_download, self._search_options)
-        
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_url = {executor.submit(self._download_image, url, word): url for url in urls}
-            paths = [future.result() for future in as_completed(future_to_url) if future.result() is not None]
-        
+        rejected = self._rejected_urls.setdefault(word, set())
+        # Ask for enough results to get past every URL already rejected or on disk
+        n = len(rejected) + len(paths) + max(self.to_download, min_images - len(paths))
+        for _ in range(self.search_rounds):
+            check_cancelled(self.cancel_event)
+            held = set(paths)
+            urls = [
+                url for url in self._run_search(word, n)
+                if url not in rejected and os.path.abspath(self._image_path(url, word)) not in held
+            ]
+            if not urls:
+                break
+
+            new_paths = []
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = {executor.submit(self._download_image, url, word): url for url in urls}
+                for future in as_completed(futures):
+                    path = future.result()
+                    if path is None:
+                        rejected.add(futures[future])
+                    else:
+                        new_paths.append(path)
+            self._store_downloads(paths, new_paths)
+
+            if len(paths) >= min_images:
+                break
+            logger.info(f"Only {len(paths)} of {min_images} usable images for keyword: {word}, requesting replacements")
+            n = len(rejected) + len(paths) + max(self.to_download, min_images - len(paths))
+
+        undersized = self._undersized.get(word, {})
+        if not paths and undersized:
+            # Upscaled images beat failing the render for want of any image
+            logger.warning(f"No image for keyword: {word} reaches {self._size[0]}x{self._size[1]}, "
+                           f"using the largest smaller ones")
+            largest = sorted(undersized, key=undersized.get, reverse=True)[:max(min_images, 1)]
+            new_paths = [self._download_image(url, word, allow_small=True) for url in largest]
+            self._store_downloads(paths, [path for path in new_paths if path is not None])
+
         self._memory[word] = paths
-        if self._resize and paths:
-            self._resize_images(word)
-        
         logger.info(f"Downloaded {len(paths)} images for keyword: {word}")
         return paths
 
-    def _resize_images(self, keyword: str):
-        directory = os.path.join(self.download_folder, keyword)
-        for file in os.listdir(directory):
-            file_path = os.path.join(directory, file)
+    def _store_downloads(self, paths: List[str], new_paths: List[str]) -> None:
+        if self._resize and new_paths:
+            self._resize_images(new_paths)
+        for path in new_paths:
+            get_cache_manager().track(path, "downloads")
+        paths.extend(path for path in new_paths if path not in paths)
+
+    def _resize_images(self, paths: List[str]):
+        for file_path in paths:
             if not os.path.isfile(file_path):
                 continue
             try:
@@ -106,8 +283,14 @@ class ImageGrabber:
                     x, y = (self._size[0] - im.width) // 2, (self._size[1] - im.height) // 2
                     background.paste(im, (x, y))
                     
-                    save_path = file_path if im.format != "WEBP" else f"{file_path}.{self.IMAGE_FORMAT.lower()}"
-                    background.save(save_path, self.IMAGE_FORMAT)
+                    # Other threads and processes may be reading the image meanwhile
+                    partial_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.part"
+                    try:
+                        background.save(partial_path, self.IMAGE_FORMAT)
+                        os.replace(partial_path, file_path)
+                    finally:
+                        if os.path.exists(partial_path):
+                            os.remove(partial_path)
                     logger.debug(f"Resized image: {file_path}")
             except IOError as e:
-                logger.error(f"Failed to resize image {file_path}: {e}")
\ No newline at end of file
+                logger.error(f"Failed to resize image {file_path}: {e}")
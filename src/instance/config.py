@@ -1,2 +1,34 @@
+import os
+
+# Instance defaults, overridable through TTV_* environment variables
+DEFAULTS = {
+    "API_HOST": "127.0.0.1",
+    "API_PORT": 8000,
+    "JOBS_DB": "jobs.db",
+    "OUTPUT_DIRECTORY": "output",
+    "WORKERS": 2,
+    "MAX_QUEUED_JOBS": 20,
+    "MAX_SCRIPT_BYTES": 1024 * 1024,
+    "FRAME_CACHE_MB": 1024,
+    "FRAME_CACHE_MMAP_DIR": "",
+    "CACHE_DB": "cache.db",
+    "DOWNLOADS_QUOTA_MB": 2048,
+    "AUDIO_QUOTA_MB": 512,
+    "TEMP_QUOTA_MB": 2048,
+    "ENCODER_PROFILE": "standard",
+    "ENCODER_PROFILES_FILE": "encoder_profiles.json",
+}
+
+
 def config():
-    print("config imported successfully")
\ No newline at end of file
+    """
+    Build the instance configuration from DEFAULTS and the environment.
+
+    Returns:
+        dict: Setting name to value, with values cast to the type of their default.
+    """
+    settings = {}
+    for key, default in DEFAULTS.items():
+        value = os.environ.get(f"TTV_{key}")
+        settings[key] = type(default)(value) if value is not None else default
+    return settings
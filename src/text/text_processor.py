@@ -8,6 +8,7 @@ import logging
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.video.video_segment import VideoSegment
+from src.video.transitions import MOTIONS, TRANSITIONS
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +26,15 @@ class TextProcessor:
     TEXT_TEMPLATES = {
         "image": r"\[IMAGE:\s*(.+?)(\d*?)]",
         "search_voice": r"\[VOICE:\s*(.+?)](.+?)\[\/VOICE]",
+        "transition": r"\[TRANSITION:\s*(\w+)\s*(\d+(?:\.\d+)?)?\s*]",
+        "motion": r"\[MOTION:\s*(\w+)\s*]",
     }
 
     DEFAULT_IMAGE_COUNT = 5
     DEFAULT_VOICE = "DEFAULT"
+    DEFAULT_TRANSITION = "cut"
+    DEFAULT_TRANSITION_DURATION = 1.0
+    DEFAULT_MOTION = "none"
 
 
     def _process_text_for_images(self) -> None:
@@ -74,12 +80,52 @@ class TextProcessor:
         Returns:
             VideoSegment: The created video segment.
         """
+        sentence, effects = self._process_effects(sentence)
         try:
             voiceover_segments = self._process_voices(sentence)
-            return VideoSegment(sentence, voiceover_segments, image_keyword, order, images_number)
+            return VideoSegment(sentence, voiceover_segments, image_keyword, order, images_number, **effects)
         except Exception as e:
             logger.error(f"Error creating video segment: {e}", exc_info=True)
-            return VideoSegment(sentence, [], image_keyword, order, images_number)
+            return VideoSegment(sentence, [], image_keyword, order, images_number, **effects)
+
+    def _process_effects(self, text: str) -> Tuple[str, Dict]:
+        """
+        Extracts [TRANSITION: name seconds] and [MOTION: name] tags from a segment.
+
+        Args:
+            text (str): The segment text.
+
+        Returns:
+            Tuple[str, Dict]: The text without the tags, and the transition/motion
+            keyword arguments for VideoSegment.
+        """
+        effects = {
+            "transition": self.DEFAULT_TRANSITION,
+            "transition_duration": self.DEFAULT_TRANSITION_DURATION,
+            "motion": self.DEFAULT_MOTION,
+        }
+
+        transition = re.search(self.TEXT_TEMPLATES["transition"], text)
+        if transition:
+            name = transition.group(1).lower()
+            if name in TRANSITIONS:
+                effects["transition"] = name
+                if transition.group(2):
+                    effects["transition_duration"] = float(transition.group(2))
+            else:
+                logger.warning(f"Unknown transition '{name}', using {self.DEFAULT_TRANSITION}")
+
+        motion = re.search(self.TEXT_TEMPLATES["motion"], text)
+        if motion:
+            name = motion.group(1).lower()
+            if name in MOTIONS:
+                effects["motion"] = name
+            else:
+                logger.warning(f"Unknown motion '{name}', using {self.DEFAULT_MOTION}")
+
+        for template in ("transition", "motion"):
+            text = re.sub(self.TEXT_TEMPLATES[template], "", text)
+        return text.strip(), effects
 
     def _process_voices(self, text: str) -> List[Dict[str, str]]:
         """
@@ -0,0 +1,272 @@
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.instance import config
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class CacheManager:
+    """
+    Index of cached artifacts with per-cache quotas and LRU eviction.
+
+    Every file written to downloads/, audio/ and temp/ is recorded with its size and
+    last access time. Files written for a single render are tagged with its run id
+    and removed by cleanup_run() when the render ends. Files the index does not
+    know about, e.g. from before it existed, are picked up by scan().
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS artifacts (
+            path TEXT PRIMARY KEY,
+            cache TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL,
+            run_id TEXT
+        )
+    """
+
+    def __init__(self, db_path: str = "cache.db", caches: Optional[Dict[str, Tuple[str, int]]] = None):
+        """
+        Initialize the cache manager.
+
+        Args:
+            db_path (str, optional): SQLite index file. Defaults to "cache.db".
+            caches (Optional[Dict[str, Tuple[str, int]]], optional): Cache name to (folder, quota in bytes).
+        """
+        self.db_path = db_path
+        self.caches = caches or {}
+        with self._connect() as conn:
+            conn.execute(self.SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS artifacts_lru ON artifacts (cache, last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+        finally:
+            conn.close()
+
+    def track(self, path: str, cache: str, run_id: Optional[str] = None) -> None:
+        """
+        Record a newly written artifact.
+
+        Args:
+            path (str): Artifact file.
+            cache (str): Name of the cache it belongs to.
+            run_id (Optional[str], optional): Render that owns it, for per-run temporaries.
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, cache, size, last_access, run_id) VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(path), cache, size, time.time(), run_id),
+            )
+
+    def touch(self, paths: Iterable[str]) -> None:
+        """
+        Mark artifacts as used now, e.g. on a cache hit.
+
+        Args:
+            paths (Iterable[str]): Artifact files.
+        """
+        now = time.time()
+        rows = [(now, os.path.abspath(path)) for path in paths]
+        if not rows:
+            return
+        with self._connect() as conn:
+            conn.executemany("UPDATE artifacts SET last_access = ? WHERE path = ?", rows)
+
+    def _remove(self, conn, path: str, cache: Optional[str] = None) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+        if cache in self.caches:
+            self._remove_empty_dirs(os.path.dirname(path), os.path.abspath(self.caches[cache][0]))
+
+    @staticmethod
+    def _remove_empty_dirs(directory: str, root: str) -> None:
+        # Empty keyword folders would otherwise look like a cached search with no results
+        while directory.startswith(root + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                return
+            directory = os.path.dirname(directory)
+
+    def scan(self) -> int:
+        """
+        Reconcile the index with the cache folders.
+
+        Untracked files are added with their modification time as last access, and
+        rows for files that no longer exist are dropped.
+
+        Returns:
+            int: Number of files added to the index.
+        """
+        added = 0
+        with self._connect() as conn:
+            known = {path for (path,) in conn.execute("SELECT path FROM artifacts")}
+            rows = []
+            for cache, (folder, _) in self.caches.items():
+                for root, _, files in os.walk(folder):
+                    for file in files:
+                        path = os.path.abspath(os.path.join(root, file))
+                        if path in known:
+                            known.discard(path)
+                            continue
+                        stat = os.stat(path)
+                        rows.append((path, cache, stat.st_size, stat.st_mtime))
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR IGNORE INTO artifacts (path, cache, size, last_access) VALUES (?, ?, ?, ?)", rows
+            )
+            added = len(rows)
+            missing = [(path,) for path in known if not os.path.exists(path)]
+            conn.executemany("DELETE FROM artifacts WHERE path = ?", missing)
+            conn.execute("COMMIT")
+        logger.info(f"Scan added {added} files and dropped {len(missing)} missing ones")
+        return added
+
+    def usage(self) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Get the usage of every cache.
+
+        Returns:
+            Dict[str, Tuple[int, int, int]]: Cache name to (files, bytes, quota in bytes).
+        """
+        with self._connect() as conn:
+            totals = {
+                cache: (files, size)
+                for cache, files, size in conn.execute(
+                    "SELECT cache, COUNT(*), COALESCE(SUM(size), 0) FROM artifacts GROUP BY cache"
+                )
+            }
+        names = list(self.caches) + [cache for cache in totals if cache not in self.caches]
+        return {
+            cache: totals.get(cache, (0, 0)) + (self.caches.get(cache, (None, 0))[1],)
+            for cache in names
+        }
+
+    def enforce(self, cache: Optional[str] = None) -> int:
+        """
+        Evict least recently used artifacts from caches over their quota.
+
+        Per-run temporaries count towards the quota but are never evicted: a render
+        may still be using them, and cleanup_run() removes them when it finishes.
+
+        Args:
+            cache (Optional[str], optional): Only enforce this cache. Defaults to all caches.
+
+        Returns:
+            int: Bytes freed.
+        """
+        freed = 0
+        names = [cache] if cache else list(self.caches)
+        with self._connect() as conn:
+            for name in names:
+                quota = self.caches[name][1]
+                (used,) = conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM artifacts WHERE cache = ?", (name,)
+                ).fetchone()
+                if used <= quota:
+                    continue
+                rows = conn.execute(
+                    "SELECT path, size FROM artifacts WHERE cache = ? AND run_id IS NULL ORDER BY last_access", (name,)
+                ).fetchall()
+                for path, size in rows:
+                    if used <= quota:
+                        break
+                    self._remove(conn, path, name)
+                    used -= size
+                    freed += size
+                logger.info(f"Evicted {name} cache down to {used / MB:.1f} MB of {quota / MB:.1f} MB")
+        return freed
+
+    def cleanup_run(self, run_id: str) -> int:
+        """
+        Delete the per-run temporaries of a finished render.
+
+        Args:
+            run_id (str): Run id the artifacts were tracked with.
+
+        Returns:
+            int: Number of files removed.
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT path, cache FROM artifacts WHERE run_id = ?", (run_id,)).fetchall()
+            for path, cache in rows:
+                self._remove(conn, path, cache)
+        return len(rows)
+
+
+_cache_manager: Optional[CacheManager] = None
+_cache_manager_lock = Lock()
+
+
+def get_cache_manager() -> CacheManager:
+    """
+    Get the process-wide CacheManager, creating it from the instance config on first use.
+
+    The index file and quotas come from CACHE_DB and the *_QUOTA_MB settings.
+    """
+    global _cache_manager
+    with _cache_manager_lock:
+        if _cache_manager is None:
+            settings = config.config()
+            _cache_manager = CacheManager(
+                settings["CACHE_DB"],
+                {
+                    "downloads": ("downloads", settings["DOWNLOADS_QUOTA_MB"] * MB),
+                    "audio": ("audio", settings["AUDIO_QUOTA_MB"] * MB),
+                    "temp": ("temp", settings["TEMP_QUOTA_MB"] * MB),
+                },
+            )
+        return _cache_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and prune the TTV caches.")
+    parser.add_argument("command", choices=["report", "prune"], help="Show cache usage, or evict down to the quotas")
+    parser.add_argument("--cache", type=str, default=None, help="Only prune this cache")
+    parser.add_argument("--scan", action="store_true", help="Index files written outside the cache manager first")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    manager = get_cache_manager()
+    if args.cache and args.cache not in manager.caches:
+        parser.error(f"Unknown cache: {args.cache}")
+    if args.scan:
+        manager.scan()
+
+    if args.command == "prune":
+        freed = manager.enforce(args.cache)
+        print(f"Freed {freed / MB:.1f} MB")
+
+    print(f"{'cache':<12}{'files':>8}{'size MB':>12}{'quota MB':>12}{'used':>8}")
+    for cache, (files, size, quota) in manager.usage().items():
+        used = f"{size / quota:.0%}" if quota else "-"
+        print(f"{cache:<12}{files:>8}{size / MB:>12.1f}{quota / MB:>12.1f}{used:>8}")
+
+
+if __name__ == "__main__":
+    main()
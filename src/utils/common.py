@@ -1,5 +1,20 @@
 import os
 
 
+class RenderCancelled(Exception):
+    """Raised inside a render when its cancel event has been set."""
+
+
 def mkdir(directory):
     os.makedirs(directory, exist_ok=True)
+
+
+def check_cancelled(cancel_event) -> None:
+    """
+    Raise RenderCancelled if the given threading/multiprocessing Event is set.
+
+    Args:
+        cancel_event: Event to check, or None when the work cannot be cancelled.
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise RenderCancelled("Render cancelled")
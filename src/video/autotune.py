@@ -0,0 +1,229 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.instance import config
+from src.video.encoder_profiles import ffmpeg_params, get_profile
+from src.video.transitions import MOTIONS, SlideshowClip
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow"]
+SAMPLE_SECONDS = 10.0
+SAMPLE_IMAGES = 4
+
+
+def _ffmpeg() -> str:
+    import imageio_ffmpeg
+
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def build_sample(images: List[str], size: Tuple[int, int], fps: int, motion: str, output_file: str,
+                 seconds: float = SAMPLE_SECONDS) -> None:
+    """
+    Render a losslessly encoded sample segment to benchmark encoders against.
+
+    The sample goes through the same slideshow renderer as real segments, so it has
+    the same crossfades and motion the encoder has to deal with.
+
+    Args:
+        images (List[str]): Source images.
+        size (Tuple[int, int]): Frame size.
+        fps (int): Frame rate.
+        motion (str): Slideshow motion, see transitions.MOTIONS.
+        output_file (str): Lossless reference video.
+        seconds (float, optional): Sample length. Defaults to 10.
+    """
+    # The slideshow reads frames through the frame cache, so fit the images into files next to the sample
+    frames = []
+    for i, path in enumerate(images):
+        frame_path = os.path.join(os.path.dirname(output_file), f"sample_{i}.png")
+        with Image.open(path) as img:
+            ImageOps.fit(img.convert("RGB"), size).save(frame_path)
+        frames.append(frame_path)
+    clip = SlideshowClip(frames, seconds, transition="crossfade", transition_duration=1.0, motion=motion)
+    clip.write_videofile(output_file, fps=fps, codec="libx264", preset="ultrafast",
+                         ffmpeg_params=["-qp", "0"], audio=False, logger=None)
+
+
+def _psnr(encoded: str, reference: str) -> float:
+    command = [_ffmpeg(), "-hide_banner", "-i", encoded, "-i", reference, "-lavfi", "psnr", "-f", "null", "-"]
+    result = subprocess.run(command, capture_output=True, text=True)
+    match = re.search(r"average:(inf|[\d.]+)", result.stderr)
+    if result.returncode != 0 or match is None:
+        raise RuntimeError(f"PSNR measurement failed: {result.stderr.strip()[-500:]}")
+    return float("inf") if match.group(1) == "inf" else float(match.group(1))
+
+
+def benchmark(reference: str, profile: Dict, work_dir: str, seconds: float) -> Dict:
+    """
+    Encode the reference with a profile's video settings and measure it.
+
+    Args:
+        reference (str): Lossless reference video.
+        profile (Dict): Candidate encoder profile.
+        work_dir (str): Folder for the encoded file.
+        seconds (float): Reference length, to scale file size to a minute.
+
+    Returns:
+        Dict: encode seconds, PSNR in dB and MB per minute of video.
+    """
+    encoded = os.path.join(work_dir, "candidate.mp4")
+    command = [_ffmpeg(), "-y", "-loglevel", "error", "-i", reference, "-an", "-c:v", profile["codec"]]
+    if profile["preset"]:
+        command += ["-preset", profile["preset"]]
+    if profile["bitrate"]:
+        command += ["-b:v", profile["bitrate"]]
+    if profile["threads"] is not None:
+        command += ["-threads", str(profile["threads"])]
+    command += ffmpeg_params(profile) + [encoded]
+
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"Encode failed: {result.stderr.strip()[-500:]}")
+    return {
+        "seconds": elapsed,
+        "psnr": _psnr(encoded, reference),
+        "mb_per_minute": os.path.getsize(encoded) / MB * 60 / seconds,
+    }
+
+
+def tune(reference: str, base: Dict, presets: List[str], threads: List[Optional[int]], seconds: float,
+         min_psnr: Optional[float] = None, max_mb_per_minute: Optional[float] = None) -> Tuple[Optional[Dict], List[Dict]]:
+    """
+    Benchmark every preset and thread count and pick the fastest that meets the targets.
+
+    Args:
+        reference (str): Lossless reference video.
+        base (Dict): Profile the candidates are derived from; its CRF or bitrate is kept.
+        presets (List[str]): x264 presets to try.
+        threads (List[Optional[int]]): Thread counts to try, None for ffmpeg's choice.
+        seconds (float): Reference length.
+        min_psnr (Optional[float], optional): Lowest acceptable PSNR in dB.
+        max_mb_per_minute (Optional[float], optional): Largest acceptable size per minute of video.
+
+    Returns:
+        Tuple[Optional[Dict], List[Dict]]: The chosen profile (None if no candidate meets the
+            targets) and every measurement.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for preset in presets:
+            for thread_count in threads:
+                candidate = dict(base, preset=preset, threads=thread_count)
+                measurement = benchmark(reference, candidate, work_dir, seconds)
+                measurement["profile"] = candidate
+                measurement["ok"] = (
+                    (min_psnr is None or measurement["psnr"] >= min_psnr)
+                    and (max_mb_per_minute is None or measurement["mb_per_minute"] <= max_mb_per_minute)
+                )
+                logger.info(f"{preset} threads={thread_count or 'auto'}: {measurement['seconds']:.2f}s, "
+                            f"{measurement['psnr']:.2f} dB, {measurement['mb_per_minute']:.1f} MB/min")
+                results.append(measurement)
+
+    passing = [result for result in results if result["ok"]]
+    best = min(passing, key=lambda result: result["seconds"]) if passing else None
+    return (best["profile"] if best else None), results
+
+
+def save_profile(name: str, profile: Dict, path: str) -> None:
+    """
+    Add or replace a profile in the profiles file, keeping the others.
+
+    The file is replaced in one step, so renders reading it meanwhile never see it half-written.
+    """
+    profiles = {}
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+    profiles[name] = profile
+    partial_path = f"{path}.{os.getpid()}.part"
+    try:
+        with open(partial_path, "w", encoding="utf-8") as f:
+            json.dump(profiles, f, indent=2)
+        os.replace(partial_path, path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+
+def _threads(value: str) -> Optional[int]:
+    return None if value == "auto" else int(value)
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(
+        description="Benchmark encoder presets on this machine and pick the fastest that meets a target.")
+    parser.add_argument("--profile", type=str, default=None, help="Profile to tune, defaults to ENCODER_PROFILE")
+    parser.add_argument("--min-psnr", type=float, default=None, help="Lowest acceptable PSNR in dB")
+    parser.add_argument("--max-mb-per-minute", type=float, default=None, help="Largest acceptable file size")
+    parser.add_argument("--presets", nargs="+", default=PRESETS, help="x264 presets to try")
+    parser.add_argument("--threads", nargs="+", type=_threads,
+                        default=[None] + sorted({max(1, cpus // 2), cpus}), help="Thread counts to try, or auto")
+    parser.add_argument("--images", type=str, default="downloads", help="Folder of images for the sample segment")
+    parser.add_argument("--sample", type=str, default=None, help="Use this video as the sample instead")
+    parser.add_argument("--size", type=str, default="1920x1080", help="Sample frame size, WxH")
+    parser.add_argument("--seconds", type=float, default=SAMPLE_SECONDS, help="Sample length")
+    parser.add_argument("--motion", type=str, default="kenburns", choices=MOTIONS,
+                        help="Sample motion; kenburns is the hardest to encode, so the pick holds for all scripts")
+    parser.add_argument("--save", type=str, default=None, help="Save the chosen settings as this profile")
+    args = parser.parse_args()
+
+    if args.min_psnr is None and args.max_mb_per_minute is None:
+        parser.error("Give a target: --min-psnr and/or --max-mb-per-minute")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    base = get_profile(args.profile)
+    profile_name = args.profile or config.config()["ENCODER_PROFILE"]
+
+    with tempfile.TemporaryDirectory() as sample_dir:
+        if args.sample:
+            # Only the first --seconds are benchmarked
+            reference = os.path.join(sample_dir, "reference.mkv")
+            subprocess.run([_ffmpeg(), "-y", "-loglevel", "error", "-i", args.sample, "-t", str(args.seconds),
+                            "-an", "-c:v", "ffv1", reference], check=True)
+        else:
+            images = sorted(glob.glob(os.path.join(args.images, "**", "*.jpg"), recursive=True))[:SAMPLE_IMAGES]
+            if not images:
+                parser.error(f"No images found in {args.images}; pass --images or --sample")
+            width, height = (int(value) for value in args.size.lower().split("x"))
+            reference = os.path.join(sample_dir, "reference.mp4")
+            build_sample(images, (width, height), base["fps"], args.motion, reference, args.seconds)
+
+        chosen, results = tune(reference, base, args.presets, args.threads, args.seconds,
+                               args.min_psnr, args.max_mb_per_minute)
+
+    print(f"{'preset':<12}{'threads':>8}{'seconds':>10}{'PSNR dB':>10}{'MB/min':>10}{'ok':>5}")
+    for result in results:
+        profile = result["profile"]
+        print(f"{profile['preset']:<12}{profile['threads'] or 'auto':>8}{result['seconds']:>10.2f}"
+              f"{result['psnr']:>10.2f}{result['mb_per_minute']:>10.1f}{'yes' if result['ok'] else 'no':>5}")
+
+    if chosen is None:
+        print("No candidate meets the target; relax it or tune a profile with a lower CRF.")
+        sys.exit(1)
+    print(f"Fastest meeting the target: preset {chosen['preset']}, threads {chosen['threads'] or 'auto'}")
+    if args.save:
+        path = config.config()["ENCODER_PROFILES_FILE"]
+        save_profile(args.save, chosen, path)
+        print(f"Saved as profile {args.save} in {path} (tuned from {profile_name})")
+
+
+if __name__ == "__main__":
+    main()
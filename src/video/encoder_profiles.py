@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import sys
+from typing import Dict, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.instance import config
+
+logger = logging.getLogger(__name__)
+
+# Settings every profile has; crf is ignored when a video bitrate is set,
+# threads None lets ffmpeg decide
+PROFILE_FIELDS = {
+    "codec": str,
+    "preset": str,
+    "crf": int,
+    "bitrate": str,
+    "threads": int,
+    "fps": int,
+    "audio_codec": str,
+    "audio_bitrate": str,
+    "pixel_format": str,
+}
+
+PROFILES = {
+    # Used for draft renders: few frames, fastest x264 preset, quality just good enough to review
+    "draft": {
+        "codec": "libx264", "preset": "ultrafast", "crf": 30, "bitrate": None, "threads": None, "fps": 12,
+        "audio_codec": "aac", "audio_bitrate": "96k", "pixel_format": "yuv420p",
+    },
+    "fast": {
+        "codec": "libx264", "preset": "veryfast", "crf": 23, "bitrate": None, "threads": None, "fps": 24,
+        "audio_codec": "aac", "audio_bitrate": "128k", "pixel_format": "yuv420p",
+    },
+    "standard": {
+        "codec": "libx264", "preset": "medium", "crf": 23, "bitrate": None, "threads": None, "fps": 24,
+        "audio_codec": "aac", "audio_bitrate": "160k", "pixel_format": "yuv420p",
+    },
+    "high": {
+        "codec": "libx264", "preset": "slow", "crf": 18, "bitrate": None, "threads": None, "fps": 30,
+        "audio_codec": "aac", "audio_bitrate": "192k", "pixel_format": "yuv420p",
+    },
+}
+
+DRAFT_PROFILE = "draft"
+
+# moviepy's writer appends -pix_fmt yuv420p after any ffmpeg_params for libx264, so other
+# pixel formats can never take effect with that codec
+FORCED_PIXEL_FORMATS = {"libx264": "yuv420p"}
+
+
+def _validate(name: str, profile: Dict) -> Dict:
+    unknown = set(profile) - set(PROFILE_FIELDS)
+    if unknown:
+        raise ValueError(f"Encoder profile {name} has unknown settings: {', '.join(sorted(unknown))}")
+    for field, field_type in PROFILE_FIELDS.items():
+        value = profile.get(field)
+        if value is not None and not isinstance(value, field_type):
+            raise ValueError(f"Encoder profile {name}: {field} must be a {field_type.__name__}")
+    forced = FORCED_PIXEL_FORMATS.get(profile.get("codec"))
+    if forced and profile.get("pixel_format") not in (None, forced):
+        raise ValueError(f"Encoder profile {name}: {profile['codec']} output is always {forced}, "
+                         f"pixel format {profile['pixel_format']} is not supported")
+    return profile
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Get the built-in profiles merged with those in the profiles file.
+
+    A profile in the file only needs the settings it changes; the rest come from
+    the built-in profile of the same name, or "standard" for new names.
+
+    Args:
+        path (Optional[str], optional): JSON file of name to settings. Defaults to ENCODER_PROFILES_FILE.
+
+    Returns:
+        Dict[str, Dict]: Profile name to complete settings.
+    """
+    path = path if path is not None else config.config()["ENCODER_PROFILES_FILE"]
+    profiles = {name: dict(profile) for name, profile in PROFILES.items()}
+    if path and os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            custom = json.load(f)
+        for name, settings in custom.items():
+            base = profiles.get(name, PROFILES["standard"])
+            profiles[name] = _validate(name, {**base, **settings})
+    return profiles
+
+
+def get_profile(name: Optional[str] = None) -> Dict:
+    """
+    Look up an encoder profile by name.
+
+    Args:
+        name (Optional[str], optional): Profile name. Defaults to ENCODER_PROFILE.
+
+    Returns:
+        Dict: The profile settings.
+
+    Raises:
+        ValueError: If there is no profile with that name.
+    """
+    name = name or config.config()["ENCODER_PROFILE"]
+    profiles = load_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown encoder profile: {name}. Available: {', '.join(sorted(profiles))}")
+    return profiles[name]
+
+
+def pixel_format(profile: Dict) -> Optional[str]:
+    """Pixel format a render with the profile actually produces, None for the codec's default."""
+    return FORCED_PIXEL_FORMATS.get(profile["codec"], profile["pixel_format"])
+
+
+def ffmpeg_params(profile: Dict) -> list:
+    params = []
+    if profile["bitrate"] is None and profile["crf"] is not None:
+        params += ["-crf", str(profile["crf"])]
+    if pixel_format(profile):
+        params += ["-pix_fmt", pixel_format(profile)]
+    return params
+
+
+def write_options(profile: Dict) -> Dict:
+    """
+    Translate a profile into keyword arguments for moviepy's write_videofile.
+
+    Args:
+        profile (Dict): Encoder profile.
+
+    Returns:
+        Dict: codec, preset, fps, bitrate, threads, audio and ffmpeg options.
+    """
+    options = {
+        "codec": profile["codec"],
+        "fps": profile["fps"],
+        "audio_codec": profile["audio_codec"],
+        "ffmpeg_params": ffmpeg_params(profile),
+    }
+    for field in ("preset", "bitrate", "threads", "audio_bitrate"):
+        if profile[field] is not None:
+            options[field] = profile[field]
+    return options
+
+
+def audio_extension(profile: Dict) -> str:
+    """Extension of the temporary audio file moviepy writes for the profile's audio codec."""
+    # Imported here so the API process can validate profile names without loading moviepy
+    from moviepy.tools import find_extension
+
+    return find_extension(profile["audio_codec"])
@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Optional
+
+import numpy as np
+from PIL import Image
+
+from src.instance import config
+from src.utils.cache_manager import get_cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+class FrameCache:
+    """
+    Process-wide LRU cache of decoded RGB frames.
+
+    Every clip showing the same resized image shares one read-only array instead
+    of decoding its own copy. Frames are evicted least recently used first once
+    their total size exceeds max_bytes. Slideshow clips read their frames from the
+    cache as they render instead of holding them, so max_bytes bounds decoded frame
+    memory; only the frames being rendered at that moment can exceed it.
+
+    With mmap_folder set, decoded frames are also written there as raw .npy files
+    and served memory-mapped, so they are paged by the OS and shared between
+    processes (e.g. API workers) that render the same images. The files are tracked
+    in the "temp" cache and evicted with it, including those left behind when a
+    proxy is regenerated.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024, mmap_folder: Optional[str] = None):
+        """
+        Initialize the frame cache.
+
+        Args:
+            max_bytes (int, optional): Memory budget for cached frames. Defaults to 1 GiB.
+            mmap_folder (Optional[str], optional): Folder for memory-mapped raw frames. Defaults to None.
+        """
+        self.max_bytes = max_bytes
+        self.mmap_folder = mmap_folder
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        # Last key seen per path, so a cached frame outlives its file being evicted from disk
+        self._latest = {}
+        self.lock = Lock()
+        if mmap_folder:
+            os.makedirs(mmap_folder, exist_ok=True)
+
+    def _key(self, path: str) -> tuple:
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if path in self._latest:
+                return self._latest[path]
+            raise
+        key = self._latest[path] = (path, stat.st_mtime_ns, stat.st_size)
+        return key
+
+    def _decode(self, key: tuple) -> np.ndarray:
+        path = key[0]
+        if self.mmap_folder:
+            name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+            raw_path = os.path.join(self.mmap_folder, f"{name}.npy")
+            if not os.path.isfile(raw_path):
+                with Image.open(path) as img:
+                    frame = np.asarray(img.convert("RGB"))
+                partial_path = f"{raw_path}.{os.getpid()}.{threading.get_ident()}.part"
+                with open(partial_path, "wb") as f:
+                    np.save(f, frame)
+                os.replace(partial_path, raw_path)
+                get_cache_manager().track(raw_path, "temp")
+            else:
+                get_cache_manager().touch([raw_path])
+            return np.load(raw_path, mmap_mode="r")
+
+        with Image.open(path) as img:
+            frame = np.array(img.convert("RGB"))
+        frame.setflags(write=False)
+        return frame
+
+    def get(self, path: str, variant: Optional[str] = None,
+            build: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> np.ndarray:
+        """
+        Get the decoded RGB frame for an image file, decoding it on first use.
+
+        A variant is a frame derived from the decoded one, e.g. enlarged for panning.
+        It is built once by build and cached and evicted like the frame itself.
+
+        Args:
+            path (str): Image file path.
+            variant (Optional[str], optional): Name of a derived frame. Defaults to the decoded frame.
+            build (Optional[Callable[[np.ndarray], np.ndarray]], optional): Builds the variant
+                from the decoded frame; required with variant.
+
+        Returns:
+            np.ndarray: Read-only HxWx3 uint8 array shared by all callers.
+        """
+        key = self._key(path) + (variant,)
+        with self.lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame
+            self.misses += 1
+
+        if variant is None:
+            frame = self._decode(key)
+        else:
+            frame = np.ascontiguousarray(build(self.get(path)))
+            frame.setflags(write=False)
+
+        with self.lock:
+            if key not in self._frames:
+                self._frames[key] = frame
+                self.used_bytes += frame.nbytes
+                self._evict()
+            return self._frames[key]
+
+    def _evict(self) -> None:
+        # Always keep the most recent frame, even if it alone exceeds the budget
+        while self.used_bytes > self.max_bytes and len(self._frames) > 1:
+            _, frame = self._frames.popitem(last=False)
+            self.used_bytes -= frame.nbytes
+
+    def clear(self) -> None:
+        with self.lock:
+            self._frames.clear()
+            self.used_bytes = 0
+
+
+_frame_cache: Optional[FrameCache] = None
+_frame_cache_lock = Lock()
+
+
+def get_frame_cache() -> FrameCache:
+    """
+    Get the process-wide FrameCache, creating it from the instance config on first use.
+
+    The budget and mmap folder come from FRAME_CACHE_MB and FRAME_CACHE_MMAP_DIR.
+    """
+    global _frame_cache
+    with _frame_cache_lock:
+        if _frame_cache is None:
+            settings = config.config()
+            _frame_cache = FrameCache(
+                max_bytes=settings["FRAME_CACHE_MB"] * 1024 * 1024,
+                mmap_folder=settings["FRAME_CACHE_MMAP_DIR"] or None,
+            )
+            logger.info(f"Frame cache budget: {settings['FRAME_CACHE_MB']} MB")
+        return _frame_cache
@@ -0,0 +1,21 @@
+from typing import Callable
+
+from proglog import ProgressBarLogger
+
+
+class EncodeProgressLogger(ProgressBarLogger):
+    """
+    proglog logger forwarding moviepy's frame progress to a callback.
+
+    The callback runs once per frame, so raising from it stops the encode promptly.
+    """
+
+    def __init__(self, on_progress: Callable[[float], None]):
+        super().__init__()
+        self._on_progress = on_progress
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if bar == "t" and attr == "index":
+            total = self.bars[bar].get("total")
+            if total:
+                self._on_progress(min(value / total, 1.0))
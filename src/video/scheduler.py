@@ -0,0 +1,111 @@
+import logging
+from typing import Dict, List
+
+from src.audio.audio import WaveNetTTS
+from src.image.image_grabber import ImageGrabber
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentScheduler:
+    """
+    Estimates how long each segment will take to build and orders them longest first.
+
+    Dispatching the slowest segments first keeps a fresh crawl or a long voiceover
+    from starting last and dominating wall time. Costs are rough seconds, only
+    their relative order matters.
+    """
+
+    # Starting Chrome and scrolling through a Google image search
+    SEARCH_COST = 30.0
+    # Streaming, sniffing and resizing one downloaded image
+    DOWNLOAD_COST_PER_IMAGE = 1.5
+    # Resizing or loading one cached image
+    CACHED_COST_PER_IMAGE = 0.2
+    # gTTS round trip per character of uncached voiceover text
+    TTS_COST_PER_CHAR = 0.02
+    # Speech rate used to predict audio length for text without cached TTS
+    WORDS_PER_SECOND = 2.5
+    # Concatenating and exporting the segment audio, per second of audio
+    AUDIO_COST_PER_SECOND = 0.05
+
+    def __init__(self, image_grabber: ImageGrabber, tts: WaveNetTTS):
+        self.image_grabber = image_grabber
+        self.tts = tts
+
+    def predicted_duration(self, segment: Dict) -> float:
+        """
+        Predict the audio duration of a segment, using cached TTS lengths where available.
+
+        Args:
+            segment (Dict): Segment keyword arguments as built by TextToVideo.
+
+        Returns:
+            float: Predicted duration in seconds.
+        """
+        duration = 0.0
+        for voiceover in segment["voiceover_text"]:
+            cached = self.tts.cached_length(voiceover["text"])
+            duration += cached if cached is not None else len(voiceover["text"].split()) / self.WORDS_PER_SECOND
+        return duration
+
+    def estimate(self, segment: Dict) -> float:
+        """
+        Estimate the cost of building a segment from cache state, text length and image count.
+
+        Args:
+            segment (Dict): Segment keyword arguments as built by TextToVideo.
+
+        Returns:
+            float: Estimated cost in seconds.
+        """
+        images_number = segment["images_number"]
+        if self.image_grabber.cached_count(segment["image_keyword"]) >= images_number:
+            cost = self.CACHED_COST_PER_IMAGE * images_number
+        else:
+            cost = self.SEARCH_COST + self.DOWNLOAD_COST_PER_IMAGE * self.image_grabber.to_download
+
+        for voiceover in segment["voiceover_text"]:
+            if self.tts.cached_length(voiceover["text"]) is None:
+                cost += self.TTS_COST_PER_CHAR * len(voiceover["text"])
+
+        cost += self.AUDIO_COST_PER_SECOND * self.predicted_duration(segment)
+        return cost
+
+    def costs(self, segments: List[Dict]) -> Dict[int, float]:
+        """
+        Estimate the cost of every segment of a script.
+
+        Segments sharing an image keyword are only charged for the search once; the
+        first of them (in script order) carries it, since the others wait for it.
+
+        Args:
+            segments (List[Dict]): Segments in script order.
+
+        Returns:
+            Dict[int, float]: Segment number to estimated cost in seconds.
+        """
+        costs = {}
+        searched = set()
+        for segment in segments:
+            cost = self.estimate(segment)
+            keyword = segment["image_keyword"].strip().lower()
+            if keyword in searched and cost >= self.SEARCH_COST:
+                cost -= self.SEARCH_COST
+            searched.add(keyword)
+            costs[segment["segment_number"]] = cost
+            logger.debug(f"Segment {segment['segment_number']} estimated at {cost:.1f}s")
+        return costs
+
+    def order(self, segments: List[Dict]) -> List[Dict]:
+        """
+        Sort segments by estimated cost, most expensive first.
+
+        Args:
+            segments (List[Dict]): Segments in script order.
+
+        Returns:
+            List[Dict]: The same segments in dispatch order.
+        """
+        costs = self.costs(segments)
+        return sorted(segments, key=lambda segment: costs[segment["segment_number"]], reverse=True)
@@ -0,0 +1,193 @@
+import logging
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from moviepy.editor import VideoClip
+
+from src.video.frame_cache import get_frame_cache
+
+logger = logging.getLogger(__name__)
+
+TRANSITIONS = ("cut", "crossfade")
+MOTIONS = ("none", "pan", "kenburns")
+
+# Ken Burns end points as (x, y) anchors of the zoomed crop, cycled per image
+KEN_BURNS_ANCHORS = [(0.5, 0.5), (0.0, 0.0), (1.0, 1.0), (1.0, 0.0), (0.0, 1.0)]
+KEN_BURNS_ZOOM = 1.15
+PAN_SCALE = 1.1
+
+
+def crossfade(a: np.ndarray, b: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Blend two frames with integer arithmetic, alpha=0 giving a and alpha=1 giving b.
+
+    Args:
+        a (np.ndarray): Outgoing HxWx3 uint8 frame.
+        b (np.ndarray): Incoming frame of the same shape.
+        alpha (float): Weight of b.
+
+    Returns:
+        np.ndarray: Blended uint8 frame.
+    """
+    weight = int(alpha * 256)
+    if weight <= 0:
+        return a
+    if weight >= 256:
+        return b
+    blended = a.astype(np.uint16) * (256 - weight)
+    blended += b.astype(np.uint16) * weight
+    blended >>= 8
+    return blended.astype(np.uint8)
+
+
+class KenBurns:
+    """
+    Slow zoom and pan across one frame.
+
+    Each output frame is a single bilinear resize of a sub-pixel crop box done in C
+    by PIL. That resample is the most expensive part of rendering a slideshow, tens
+    of milliseconds per 1080p frame where cut and pan frames are nearly free; the
+    README gives measured costs. The frame is read from the shared frame cache
+    every time; only the crop is copied.
+    """
+
+    def __init__(self, path: str, index: int = 0, zoom: float = KEN_BURNS_ZOOM):
+        self.path = path
+        self.zoom = zoom
+        # Alternate zooming in and out, and vary where the crop drifts to
+        self.zoom_in = index % 2 == 0
+        self.anchor = KEN_BURNS_ANCHORS[index % len(KEN_BURNS_ANCHORS)]
+
+    def _box(self, progress: float, size: Tuple[int, int]) -> Tuple[float, float, float, float]:
+        amount = progress if self.zoom_in else 1 - progress
+        scale = 1 + (self.zoom - 1) * amount
+        width, height = size
+        crop_w, crop_h = width / scale, height / scale
+        # Drift from the centre towards the anchor as the zoom grows
+        ax = 0.5 + (self.anchor[0] - 0.5) * amount
+        ay = 0.5 + (self.anchor[1] - 0.5) * amount
+        x0, y0 = (width - crop_w) * ax, (height - crop_h) * ay
+        return x0, y0, x0 + crop_w, y0 + crop_h
+
+    def frame_at(self, progress: float) -> np.ndarray:
+        progress = min(max(progress, 0.0), 1.0)
+        frame = get_frame_cache().get(self.path)
+        height, width = frame.shape[:2]
+        x0, y0, x1, y1 = self._box(progress, (width, height))
+        # Hand PIL only the pixels under the box, then resample relative to them
+        left, top = int(x0), int(y0)
+        right, bottom = min(math.ceil(x1), width), min(math.ceil(y1), height)
+        crop = Image.fromarray(frame[top:bottom, left:right])
+        box = (x0 - left, y0 - top, x1 - left, y1 - top)
+        return np.asarray(crop.resize((width, height), Image.BILINEAR, box=box))
+
+
+def enlarge(frame: np.ndarray, scale: float) -> np.ndarray:
+    height, width = frame.shape[:2]
+    size = (int(round(width * scale)), int(round(height * scale)))
+    return np.asarray(Image.fromarray(frame).resize(size, Image.LANCZOS))
+
+
+class Pan:
+    """
+    Horizontal pan across a slightly enlarged frame.
+
+    The enlarged frame is built on first use and kept in the shared frame cache, so
+    it counts against the cache budget and is shared by every clip using the image.
+    Every output frame is then a numpy slice of it, so panning costs no resampling.
+    """
+
+    def __init__(self, path: str, index: int = 0, scale: float = PAN_SCALE):
+        self.path = path
+        self.scale = scale
+        # Alternate panning left-to-right and right-to-left
+        self.left_to_right = index % 2 == 0
+
+    def frame_at(self, progress: float) -> np.ndarray:
+        progress = min(max(progress, 0.0), 1.0)
+        frame_cache = get_frame_cache()
+        height, width = frame_cache.get(self.path).shape[:2]
+        enlarged = frame_cache.get(self.path, f"pan{self.scale}", lambda frame: enlarge(frame, self.scale))
+        amount = progress if self.left_to_right else 1 - progress
+        x = int(round((enlarged.shape[1] - width) * amount))
+        y = (enlarged.shape[0] - height) // 2
+        return enlarged[y:y + height, x:x + width]
+
+
+class SlideshowClip(VideoClip):
+    """
+    Clip showing images one after another with optional crossfades and pan/zoom motion.
+
+    Frames are read from the shared frame cache in make_frame, so a segment costs
+    one blend or resample per output frame instead of a CompositeVideoClip per
+    image, and the clip holds no decoded frames of its own: the cache budget
+    bounds frame memory however many clips are waiting to be encoded.
+    """
+
+    def __init__(self, images: List[str], duration: float, transition: str = "cut",
+                 transition_duration: float = 1.0, motion: str = "none"):
+        """
+        Initialize the slideshow.
+
+        Args:
+            images (List[str]): Equally sized image files, shown for equal time.
+            duration (float): Total duration in seconds.
+            transition (str, optional): "cut" or "crossfade" between frames. Defaults to "cut".
+            transition_duration (float, optional): Crossfade length in seconds. Defaults to 1.0.
+            motion (str, optional): "none", "pan" (free, slices of a pre-enlarged frame) or
+                "kenburns" (zoom and pan, one resample per frame). Defaults to "none".
+        """
+        if not images:
+            raise ValueError("A slideshow needs at least one image.")
+        self.images = images
+        self.image_duration = duration / len(images)
+        self.transition = transition
+        self.fade = min(transition_duration, self.image_duration / 2)
+        motion_class = {"pan": Pan, "kenburns": KenBurns}.get(motion)
+        self.motions = [motion_class(image, i) for i, image in enumerate(images)] if motion_class else None
+        self._tail: Optional[Tuple["SlideshowClip", float]] = None
+        super().__init__(make_frame=self._make_frame, duration=duration)
+
+    @property
+    def first_frame(self) -> np.ndarray:
+        return self._image_frame(0, 0.0)
+
+    def fade_into(self, following: "SlideshowClip", duration: float) -> None:
+        """
+        Crossfade the end of the slideshow into the first frame of another, e.g. the next segment.
+
+        Copies made by moviepy's set_* methods share this clip's make_frame, so this also
+        applies to them.
+        """
+        frame_cache = get_frame_cache()
+        if frame_cache.get(following.images[0]).shape != frame_cache.get(self.images[-1]).shape:
+            logger.warning("Skipping crossfade into a frame of a different size")
+            return
+        self._tail = (following, min(duration, self.image_duration / 2))
+
+    def _image_frame(self, index: int, progress: float) -> np.ndarray:
+        if self.motions is None:
+            return get_frame_cache().get(self.images[index])
+        return self.motions[index].frame_at(progress)
+
+    def _make_frame(self, t: float) -> np.ndarray:
+        if self.image_duration <= 0:
+            return self._image_frame(0, 0.0)
+
+        count = len(self.images)
+        index = min(int(t // self.image_duration), count - 1)
+        local = t - index * self.image_duration
+        frame = self._image_frame(index, local / self.image_duration)
+
+        remaining = self.image_duration - local
+        if self.transition == "crossfade" and index + 1 < count and remaining < self.fade:
+            incoming = self._image_frame(index + 1, 0.0)
+            return crossfade(frame, incoming, 1 - remaining / self.fade)
+
+        if self._tail is not None and index == count - 1:
+            following, tail_duration = self._tail
+            if 0 < tail_duration and remaining < tail_duration:
+                return crossfade(frame, following.first_frame, 1 - remaining / tail_duration)
+        return frame
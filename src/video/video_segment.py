@@ -1,13 +1,12 @@
 import logging
 import os
 import random
-from typing import List, Dict, Tuple
+import threading
+from typing import Callable, List, Dict, Optional, Tuple
 import requests
 from PIL import Image
 from moviepy.editor import (
-    ImageClip,
-    concatenate_videoclips,
-    CompositeVideoClip,
+    VideoClip,
     AudioFileClip
 )
 from pydub import AudioSegment
@@ -18,6 +17,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.image.image_grabber import ImageGrabber 
 from src.audio.audio import WaveNetTTS
+from src.utils.common import RenderCancelled
+from src.utils.cache_manager import get_cache_manager
+from src.video.frame_cache import get_frame_cache
+from src.video.transitions import SlideshowClip
 
 logger = logging.getLogger(__name__)
 
@@ -25,17 +28,28 @@ class VideoSegment:
     IMAGE_FORMAT_RGB = "RGB"
     IMAGE_FORMAT_JPEG = "JPEG"
 
-    def __init__(self, text: str, voiceover_text: List[Dict], image_keyword: str, segment_number: int, images_number: int = 5):
+    def __init__(self, text: str, voiceover_text: List[Dict], image_keyword: str, segment_number: int, images_number: int = 5,
+                 transition: str = "cut", transition_duration: float = 1.0, motion: str = "none"):
         self.segment_number = segment_number
         self.text = text
         self.voiceover_text = voiceover_text
         self.image_keyword = image_keyword
         self.images_number = images_number
+        self.transition = transition
+        self.transition_duration = transition_duration
+        self.motion = motion
+        self.images: List[str] = []
+        self.audio_path: Optional[str] = None
+        self.slideshow: Optional[SlideshowClip] = None
 
     def _download_images(self, urls: List[str], keyword: str, download_folder: str) -> List[str]:
         images = []
         os.makedirs(os.path.join(download_folder, keyword), exist_ok=True)
         for url in urls:
+            if os.path.isfile(url):
+                # ImageGrabber already returns local, validated files
+                images.append(url)
+                continue
             try:
                 download_path = os.path.join(download_folder, keyword, f"image_{len(images) + 1}.jpg")
                 if not os.path.exists(download_path):
@@ -50,45 +64,96 @@ class VideoSegment:
                 logger.error(f"Filesystem error while saving image: {e}")
         return images
 
-    def _resize_images(self, images: List[str], size: Tuple[int, int]) -> List[str]:
+    def _resize_images(self, images: List[str], size: Tuple[int, int], cache_folder: str) -> List[str]:
         resized_images = []
+        cached_images = []
         for image_path in images:
+            save_path = self._get_save_path(image_path, size, cache_folder)
+            if os.path.isfile(save_path) and os.path.getmtime(save_path) >= os.path.getmtime(image_path):
+                resized_images.append(save_path)
+                cached_images.append(save_path)
+                continue
             try:
                 with Image.open(image_path) as img:
+                    # Let the JPEG decoder downscale by DCT when building small proxies
+                    img.draft(self.IMAGE_FORMAT_RGB, size)
                     img = img.convert(self.IMAGE_FORMAT_RGB)
                     img = self._resize_image(img, size)
-                    save_path = self._get_save_path(image_path)
-                    img.save(save_path, self.IMAGE_FORMAT_JPEG)
+                    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+                    # Segments sharing a keyword build the same proxy concurrently; another
+                    # writer must never see a half-written file as a cached proxy
+                    partial_path = f"{save_path}.{os.getpid()}.{threading.get_ident()}.part"
+                    try:
+                        img.save(partial_path, self.IMAGE_FORMAT_JPEG)
+                        os.replace(partial_path, save_path)
+                    finally:
+                        if os.path.exists(partial_path):
+                            os.remove(partial_path)
                     resized_images.append(save_path)
+                get_cache_manager().track(save_path, "temp")
             except (OSError, IOError) as e:
                 logger.error(f"Error resizing image {image_path}: {e}")
+        get_cache_manager().touch(cached_images)
         return resized_images
 
     def _resize_image(self, image: Image.Image, size: Tuple[int, int]) -> Image.Image:
         return image.resize(size, Image.LANCZOS)  # LANCZOS is a high-quality downsampling filter
 
-    def _get_save_path(self, image_path: str) -> str:
-        return os.path.splitext(image_path)[0] + "_resized.jpg"
-
-    def generate_segment(self, tts: WaveNetTTS, gid: ImageGrabber, download_folder: str, size: Tuple[int, int]) -> CompositeVideoClip:
-        image_urls = gid.search_images(self.image_keyword)
-        random_image_urls = random.sample(image_urls, min(self.images_number, len(image_urls)))
-
-        images = self._download_images(random_image_urls, self.image_keyword, download_folder)
-        resized_images = self._resize_images(images, size)
-
-        image_clips = [ImageClip(image).set_duration(5) for image in resized_images]  # Set each image duration to 5 seconds
-
+    def _get_save_path(self, image_path: str, size: Tuple[int, int], cache_folder: str) -> str:
+        # Resized copies are cached per size, so draft proxies and full frames coexist
+        keyword = os.path.basename(os.path.dirname(image_path))
+        name = os.path.splitext(os.path.basename(image_path))[0]
+        return os.path.join(cache_folder, f"{size[0]}x{size[1]}", keyword, f"{name}.jpg")
+
+    def generate_segment(self, tts: WaveNetTTS, gid: ImageGrabber, download_folder: str, size: Tuple[int, int],
+                         on_stage: Optional[Callable[[str], None]] = None, fps: int = 24,
+                         images: Optional[List[str]] = None) -> VideoClip:
+        """
+        Build the clip for this segment.
+
+        Args:
+            tts (WaveNetTTS): TTS used for the voiceover.
+            gid (ImageGrabber): Image source for the segment keyword.
+            download_folder (str): Folder for per-segment artifacts.
+            size (Tuple[int, int]): Frame size.
+            on_stage (Optional[Callable[[str], None]], optional): Called with "images", "audio" and
+                "compose" as each stage starts; it may raise RenderCancelled to stop the segment.
+            fps (int, optional): Frame rate of the segment. Defaults to 24.
+            images (Optional[List[str]], optional): Source images to use instead of a random
+                sample, e.g. the choices of an earlier draft render. The images used are kept
+                in self.images either way.
+
+        Returns:
+            VideoClip: The segment clip. Its slideshow is kept in self.slideshow so a
+                crossfade into the next segment can be added afterwards.
+        """
+        on_stage = on_stage or (lambda stage: None)
+
+        on_stage("images")
+        if images is None or not all(os.path.isfile(image) for image in images):
+            image_urls = gid.search_images(self.image_keyword, self.images_number)
+            random_image_urls = random.sample(image_urls, min(self.images_number, len(image_urls)))
+            images = self._download_images(random_image_urls, self.image_keyword, download_folder)
+        self.images = images
+        resized_images = self._resize_images(images, size, os.path.join(gid.temp_folder, "proxies"))
+
+        # Decode now, while segments build in parallel, rather than during the encode; the
+        # slideshow reads frames back from the shared cache as it renders them
+        frame_cache = get_frame_cache()
+        for image in resized_images:
+            frame_cache.get(image)
+
+        on_stage("audio")
         audio_clips = []
         segment_duration = 0
 
         for voiceover in self.voiceover_text:
             try:
-                audio_path = tts.generate_tts(voiceover["text"], voiceover["voice"])
-                audio_clip = AudioSegment.from_wav(audio_path)
-                duration = len(audio_clip) / 1000  # Convert from milliseconds to seconds
+                audio_path, duration = tts.get_tts(voiceover["text"])
                 segment_duration += duration
                 audio_clips.append(audio_path)
+            except RenderCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error generating audio for voiceover: {e}")
 
@@ -96,22 +161,28 @@ class VideoSegment:
             final_audio_path = os.path.join(download_folder, f"final_audio_{self.segment_number}.wav")
             combined_audio = AudioSegment.empty()
             for audio_path in audio_clips:
-                combined_audio += AudioSegment.from_wav(audio_path)
+                combined_audio += AudioSegment.from_file(audio_path)
             combined_audio.export(final_audio_path, format="wav")
+            self.audio_path = final_audio_path
         else:
             final_audio_path = None
 
-        # Adjust the duration of image clips to match the audio duration
-        for clip in image_clips:
-            clip.duration = segment_duration / len(image_clips)
-
-        final_clip = concatenate_videoclips(image_clips, method="compose")
+        on_stage("compose")
+        # Images split the audio duration evenly; transitions and motion are rendered per frame
+        self.slideshow = SlideshowClip(
+            resized_images,
+            segment_duration,
+            transition=self.transition,
+            transition_duration=self.transition_duration,
+            motion=self.motion
+        )
+        final_clip = self.slideshow
 
         if final_audio_path:
             final_audio = AudioFileClip(final_audio_path)
             final_clip = final_clip.set_audio(final_audio)
 
         final_clip = final_clip.set_duration(segment_duration)
-        final_clip = final_clip.set_fps(24)
+        final_clip = final_clip.set_fps(fps)
 
-        return CompositeVideoClip([final_clip])
\ No newline at end of file
+        return final_clip
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from src.utils.cache_manager import CacheManager
+
+
+class CacheManagerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.downloads = os.path.join(self.root, "downloads")
+        self.manager = CacheManager(
+            os.path.join(self.root, "cache.db"),
+            {"downloads": (self.downloads, 250), "temp": (os.path.join(self.root, "temp"), 10_000)},
+        )
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, relative_path: str, size: int) -> str:
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def test_enforce_evicts_least_recently_used_first(self):
+        oldest = self._write("downloads/cat/a.jpg", 100)
+        middle = self._write("downloads/cat/b.jpg", 100)
+        newest = self._write("downloads/dog/c.jpg", 100)
+        for path in (oldest, middle, newest):
+            self.manager.track(path, "downloads")
+        # A cache hit makes the oldest file the most recently used
+        self.manager.touch([oldest])
+
+        freed = self.manager.enforce()
+
+        self.assertEqual(freed, 100)
+        self.assertTrue(os.path.exists(oldest))
+        self.assertFalse(os.path.exists(middle))
+        self.assertTrue(os.path.exists(newest))
+        self.assertEqual(self.manager.usage()["downloads"], (2, 200, 250))
+
+    def test_enforce_removes_emptied_keyword_folders(self):
+        evicted = self._write("downloads/cat/a.jpg", 200)
+        kept = self._write("downloads/dog/b.jpg", 200)
+        self.manager.track(evicted, "downloads")
+        self.manager.track(kept, "downloads")
+
+        self.manager.enforce("downloads")
+
+        self.assertFalse(os.path.exists(os.path.dirname(evicted)))
+        self.assertTrue(os.path.isdir(self.downloads))
+
+    def test_enforce_leaves_caches_under_quota_alone(self):
+        path = self._write("temp/proxy.jpg", 500)
+        self.manager.track(path, "temp")
+
+        self.assertEqual(self.manager.enforce(), 0)
+        self.assertTrue(os.path.exists(path))
+
+    def test_enforce_never_evicts_files_of_running_renders(self):
+        live = self._write("downloads/jobs/audio.wav", 200)
+        cached = self._write("downloads/cat/a.jpg", 100)
+        self.manager.track(live, "downloads", run_id="job")
+        self.manager.track(cached, "downloads")
+        self.manager.touch([cached])
+
+        self.assertEqual(self.manager.enforce(), 100)
+        self.assertTrue(os.path.exists(live))
+        self.assertFalse(os.path.exists(cached))
+
+    def test_cleanup_run_removes_only_that_runs_files(self):
+        mine = self._write("temp/run/a.wav", 10)
+        other = self._write("temp/run/b.wav", 10)
+        shared = self._write("temp/proxy.jpg", 10)
+        self.manager.track(mine, "temp", run_id="mine")
+        self.manager.track(other, "temp", run_id="other")
+        self.manager.track(shared, "temp")
+
+        self.assertEqual(self.manager.cleanup_run("mine"), 1)
+        self.assertFalse(os.path.exists(mine))
+        self.assertTrue(os.path.exists(other))
+        self.assertTrue(os.path.exists(shared))
+
+    def test_scan_indexes_untracked_files_and_drops_missing_ones(self):
+        untracked = self._write("downloads/cat/a.jpg", 10)
+        gone = self._write("downloads/cat/b.jpg", 10)
+        self.manager.track(gone, "downloads")
+        os.remove(gone)
+
+        self.assertEqual(self.manager.scan(), 1)
+        self.assertEqual(self.manager.usage()["downloads"][:2], (1, 10))
+        self.assertTrue(os.path.exists(untracked))
+
+
+if __name__ == "__main__":
+    unittest.main()
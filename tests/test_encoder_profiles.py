@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import TextToVideo as text_to_video
+from src.video.autotune import save_profile
+from src.video.encoder_profiles import PROFILES, ffmpeg_params, load_profiles
+
+
+class EncoderProfilesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "encoder_profiles.json")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_custom_profile_inherits_unset_settings(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"tuned": {"preset": "faster", "threads": 4}}, f)
+
+        tuned = load_profiles(self.path)["tuned"]
+
+        self.assertEqual((tuned["preset"], tuned["threads"]), ("faster", 4))
+        self.assertEqual(tuned["crf"], PROFILES["standard"]["crf"])
+
+    def test_libx264_rejects_pixel_formats_it_cannot_produce(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"broken": {"pixel_format": "yuv444p"}}, f)
+
+        with self.assertRaises(ValueError):
+            load_profiles(self.path)
+        self.assertEqual(ffmpeg_params(PROFILES["high"]), ["-crf", "18", "-pix_fmt", "yuv420p"])
+
+    def test_save_profile_keeps_other_profiles_and_leaves_no_partial_file(self):
+        save_profile("a", {"preset": "fast"}, self.path)
+        save_profile("b", {"preset": "slow"}, self.path)
+
+        self.assertEqual(load_profiles(self.path)["a"]["preset"], "fast")
+        self.assertEqual(load_profiles(self.path)["b"]["preset"], "slow")
+        self.assertEqual(os.listdir(self._tmp.name), ["encoder_profiles.json"])
+
+
+class RenderProfileTest(unittest.TestCase):
+    def _render(self, draft: bool):
+        with mock.patch.object(text_to_video.TextToVideo, "_download_nltk_data"):
+            return text_to_video.TextToVideo("text", "out.mp4", image_grabber=mock.Mock(), tts=mock.Mock(),
+                                             draft=draft, profile="high")
+
+    def test_profile_is_resolved_once_per_render(self):
+        ttv = self._render(draft=True)
+        self.assertEqual(ttv.encoder_profile, PROFILES["draft"])
+
+        with mock.patch.object(text_to_video, "get_profile", side_effect=AssertionError("profile re-read")):
+            ttv.encoder_profile["fps"]
+
+    def test_promotion_switches_to_the_full_profile_and_back_on_failure(self):
+        ttv = self._render(draft=True)
+
+        with mock.patch.object(ttv, "generate_video", side_effect=RuntimeError("encode failed")):
+            with self.assertRaises(RuntimeError):
+                ttv.promote()
+        self.assertEqual(ttv.encoder_profile, PROFILES["draft"])
+
+        with mock.patch.object(ttv, "generate_video") as generate_video:
+            generate_video.side_effect = lambda: self.assertEqual(ttv.encoder_profile, PROFILES["high"])
+            ttv.promote()
+        self.assertEqual(ttv.encoder_profile, PROFILES["high"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from src.utils.cache_manager import CacheManager
+from src.video import frame_cache
+from src.video.frame_cache import FrameCache
+
+# Bytes of one decoded 10x10 RGB frame
+FRAME_BYTES = 10 * 10 * 3
+
+
+class FrameCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.cache_manager = CacheManager(os.path.join(self.root, "cache.db"),
+                                          {"temp": (os.path.join(self.root, "frames"), 10 ** 9)})
+        patcher = mock.patch.object(frame_cache, "get_cache_manager", return_value=self.cache_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = FrameCache(max_bytes=2 * FRAME_BYTES)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _image(self, name: str, color=(255, 0, 0)) -> str:
+        path = os.path.join(self.root, name)
+        Image.new("RGB", (10, 10), color).save(path, "PNG")
+        return path
+
+    def test_repeated_get_returns_the_same_read_only_array(self):
+        path = self._image("a.png")
+
+        frame = self.cache.get(path)
+
+        self.assertIs(self.cache.get(path), frame)
+        self.assertFalse(frame.flags.writeable)
+        self.assertEqual((frame.shape, tuple(frame[0, 0])), ((10, 10, 3), (255, 0, 0)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_least_recently_used_frame_is_evicted_over_budget(self):
+        a, b, c = self._image("a.png"), self._image("b.png"), self._image("c.png")
+        frame_a = self.cache.get(a)
+        self.cache.get(b)
+        self.cache.get(a)
+
+        self.cache.get(c)
+
+        self.assertEqual(self.cache.used_bytes, 2 * FRAME_BYTES)
+        self.assertIs(self.cache.get(a), frame_a)
+        self.cache.get(b)
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_variants_are_built_once_from_the_decoded_frame(self):
+        path = self._image("a.png")
+        build = mock.Mock(side_effect=lambda frame: frame[:5])
+
+        variant = self.cache.get(path, "half", build)
+
+        self.assertIs(self.cache.get(path, "half", build), variant)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(variant.shape, (5, 10, 3))
+        self.assertTrue(variant.flags.c_contiguous)
+        self.assertFalse(variant.flags.writeable)
+
+    def test_cached_frame_outlives_its_file(self):
+        path = self._image("a.png")
+        frame = self.cache.get(path)
+        os.remove(path)
+
+        self.assertIs(self.cache.get(path), frame)
+
+    def test_rewritten_file_is_decoded_again(self):
+        path = self._image("a.png")
+        self.cache.get(path)
+        self._image("a.png", color=(0, 0, 255))
+        os.utime(path, ns=(0, 10 ** 18))
+
+        self.assertEqual(tuple(self.cache.get(path)[0, 0]), (0, 0, 255))
+
+    def test_mmap_frames_are_shared_through_tracked_files(self):
+        folder = os.path.join(self.root, "frames")
+        path = self._image("a.png")
+
+        frame = FrameCache(mmap_folder=folder).get(path)
+        # A second process reads the frame back from the same file
+        shared = FrameCache(mmap_folder=folder).get(path)
+
+        self.assertIsInstance(frame, np.memmap)
+        self.assertFalse(frame.flags.writeable)
+        np.testing.assert_array_equal(shared, frame)
+        self.assertEqual(len(os.listdir(folder)), 1)
+        self.assertEqual(self.cache_manager.usage()["temp"][0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
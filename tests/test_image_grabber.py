@@ -0,0 +1,158 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from src.image import image_grabber
+from src.image.image_grabber import ImageGrabber
+from src.utils.cache_manager import CacheManager
+
+
+def _jpeg(size) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, headers: dict = None):
+        self.body = body
+        self.headers = headers or {}
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            self.read = start + chunk_size
+            yield self.body[start:start + chunk_size]
+
+
+class ImageGrabberTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = self._tmp.name
+        self.downloads = os.path.join(root, "downloads")
+        cache_manager = CacheManager(os.path.join(root, "cache.db"), {"downloads": (self.downloads, 10 ** 9)})
+        patcher = mock.patch.object(image_grabber, "get_cache_manager", return_value=cache_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.grabber = ImageGrabber(size=(64, 64), to_download=3, download_location=self.downloads,
+                                    temp_location=os.path.join(root, "temp"), max_bytes=100_000, sniff_bytes=1024)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _download(self, response: FakeResponse):
+        with mock.patch.object(image_grabber.requests, "get", return_value=response):
+            return self.grabber._download_image("http://example.com/image", "cat")
+
+    def test_headers_reject_non_images_svg_and_oversized_bodies(self):
+        url = "http://example.com/image"
+        self.assertFalse(self.grabber._check_headers(url, {"Content-Type": "text/html; charset=utf-8"}))
+        self.assertFalse(self.grabber._check_headers(url, {"Content-Type": "image/svg+xml"}))
+        self.assertFalse(self.grabber._check_headers(url, {"Content-Type": "image/jpeg", "Content-Length": "200000"}))
+        self.assertTrue(self.grabber._check_headers(url, {"Content-Type": "image/jpeg", "Content-Length": "2000"}))
+        self.assertTrue(self.grabber._check_headers(url, {}))
+
+    def test_headers_leave_generic_binary_types_to_the_sniff(self):
+        url = "http://example.com/image"
+        self.assertTrue(self.grabber._check_headers(url, {"Content-Type": "application/octet-stream"}))
+        self.assertTrue(self.grabber._check_headers(url, {"Content-Type": "binary/octet-stream"}))
+        self.assertFalse(self.grabber._check_headers(url, {"Content-Type": "application/json"}))
+        self.assertIsNotNone(self._download(FakeResponse(_jpeg((128, 128)), {"Content-Type": "application/octet-stream"})))
+
+    def test_rejected_headers_stop_before_the_body_is_read(self):
+        response = FakeResponse(_jpeg((128, 128)), {"Content-Type": "text/html"})
+
+        self.assertIsNone(self._download(response))
+        self.assertEqual(response.read, 0)
+
+    def test_image_below_target_size_is_rejected(self):
+        self.assertIsNone(self._download(FakeResponse(_jpeg((32, 32)))))
+        self.assertFalse(os.path.exists(os.path.join(self.downloads, "cat")))
+
+    def test_unrecognizable_body_is_rejected_after_sniff_bytes(self):
+        response = FakeResponse(b"<html>" + b" " * 50_000)
+
+        self.assertIsNone(self._download(response))
+        self.assertLess(response.read, 50_000)
+
+    def test_body_over_budget_is_rejected(self):
+        self.assertIsNone(self._download(FakeResponse(_jpeg((128, 128)) + b"\0" * 100_000)))
+
+    def test_usable_image_is_saved(self):
+        body = _jpeg((128, 128))
+
+        path = self._download(FakeResponse(body, {"Content-Type": "image/jpeg"}))
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), body)
+
+    def _fake_search(self, rejected_urls):
+        urls = [f"http://example.com/{i}" for i in range(20)]
+
+        def download(url, keyword):
+            if url in rejected_urls:
+                return None
+            path = self.grabber._image_path(url, keyword)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(_jpeg((64, 64)))
+            return os.path.abspath(path)
+
+        downloads = mock.patch.object(self.grabber, "_download_image", side_effect=download)
+        search = mock.patch.object(self.grabber, "_run_search", side_effect=lambda word, n: urls[:n])
+        return downloads, search
+
+    def test_largest_small_images_are_used_when_none_reaches_the_target(self):
+        bodies = {f"http://example.com/{i}": _jpeg((8 * (i + 1), 8 * (i + 1))) for i in range(6)}
+
+        def get(url, **kwargs):
+            return FakeResponse(bodies[url])
+
+        with mock.patch.object(image_grabber.requests, "get", side_effect=get), \
+                mock.patch.object(self.grabber, "_run_search", side_effect=lambda word, n: list(bodies)[:n]):
+            paths = self.grabber.search_images("cat", min_images=2)
+
+        sizes = []
+        for path in paths:
+            with Image.open(path) as img:
+                sizes.append(img.size)
+        self.assertEqual(sorted(sizes), [(40, 40), (48, 48)])
+
+    def test_rejected_downloads_are_replaced_by_later_searches(self):
+        downloads, search = self._fake_search({"http://example.com/3", "http://example.com/5"})
+        with downloads as download, search:
+            self.assertEqual(len(self.grabber.search_images("Cat")), 3)
+            self.assertGreaterEqual(len(self.grabber.search_images("cat", min_images=5)), 5)
+            fetched = [call.args[0] for call in download.call_args_list]
+
+        # Neither rejected URLs nor images already on disk are fetched twice
+        self.assertEqual(len(fetched), len(set(fetched)))
+
+    def test_deleted_images_are_downloaded_again(self):
+        downloads, search = self._fake_search({"http://example.com/1"})
+        with downloads, search:
+            self.grabber.search_images("cat", min_images=5)
+            shutil.rmtree(os.path.join(self.downloads, "cat"))
+
+            paths = self.grabber.search_images("cat", min_images=5)
+
+        self.assertGreaterEqual(len(paths), 5)
+        self.assertTrue(all(os.path.isfile(path) for path in paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.api.jobs import JobQueue, QueueFullError
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self._tmp.name, "jobs.db"), max_queued=2)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_submit_refuses_jobs_beyond_max_queued(self):
+        self.queue.submit("one")
+        self.queue.submit("two")
+
+        with self.assertRaises(QueueFullError):
+            self.queue.submit("three")
+        self.assertEqual(len(self.queue.list_jobs()), 2)
+
+        # A claimed job frees its slot
+        self.queue.claim("worker-1")
+        self.queue.submit("three")
+
+    def test_claim_takes_the_oldest_job_with_its_options(self):
+        first = self.queue.submit("one", {"draft": True})
+        time.sleep(0.01)
+        self.queue.submit("two")
+
+        job = self.queue.claim("worker-1")
+
+        self.assertEqual((job["id"], job["status"], job["worker"]), (first, JobQueue.RUNNING, "worker-1"))
+        self.assertEqual(job["options"], {"draft": True})
+        self.assertEqual(self.queue.get(first)["status"], JobQueue.RUNNING)
+
+    def test_each_job_is_claimed_by_one_worker_only(self):
+        queue = JobQueue(self.queue.db_path, max_queued=50)
+        submitted = {queue.submit(f"script {i}") for i in range(20)}
+        claimed = []
+
+        def work(name):
+            while True:
+                job = queue.claim(name)
+                if job is None:
+                    return
+                claimed.append(job["id"])
+
+        threads = [threading.Thread(target=work, args=(f"worker-{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(claimed), sorted(submitted))
+
+    def test_requeue_running_resets_interrupted_jobs(self):
+        job_id = self.queue.submit("one")
+        self.queue.claim("worker-1")
+        self.queue.update_progress(job_id, "segments", 0.5)
+
+        self.assertEqual(self.queue.requeue_running(), 1)
+
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["worker"], job["stage"], job["progress"]), (JobQueue.QUEUED, None, None, 0))
+        self.assertEqual(self.queue.claim("worker-2")["id"], job_id)
+
+    def test_fail_worker_jobs_fails_only_that_workers_running_jobs(self):
+        mine = self.queue.submit("one")
+        self.queue.claim("worker-1")
+        other = self.queue.submit("two")
+        self.queue.claim("worker-2")
+        waiting = self.queue.submit("three")
+
+        self.assertEqual(self.queue.fail_worker_jobs("worker-1", "Worker exited with code -9"), 1)
+
+        self.assertEqual(self.queue.get(mine)["status"], JobQueue.FAILED)
+        self.assertEqual(self.queue.get(mine)["error"], "Worker exited with code -9")
+        self.assertEqual(self.queue.get(other)["status"], JobQueue.RUNNING)
+        self.assertEqual(self.queue.get(waiting)["status"], JobQueue.QUEUED)
+
+    def test_complete_keeps_segment_images_for_promotion(self):
+        job_id = self.queue.submit("one")
+        self.queue.claim("worker-1")
+
+        self.queue.complete(job_id, "out.mp4", {1: ["a.jpg"]})
+
+        job = self.queue.get(job_id)
+        self.assertEqual((job["status"], job["progress"], job["output_file"]), (JobQueue.DONE, 1, "out.mp4"))
+        self.assertEqual(job["segment_images"], {"1": ["a.jpg"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from src.video.scheduler import SegmentScheduler
+
+
+class FakeGrabber:
+    to_download = 20
+
+    def __init__(self, cached: dict):
+        self.cached = cached
+
+    def cached_count(self, keyword: str) -> int:
+        return self.cached.get(keyword.strip().lower(), 0)
+
+
+class FakeTTS:
+    def __init__(self, lengths: dict):
+        self.lengths = lengths
+
+    def cached_length(self, text: str):
+        return self.lengths.get(text)
+
+
+def _segment(number: int, keyword: str, text: str, images: int = 5) -> dict:
+    return {"segment_number": number, "image_keyword": keyword, "images_number": images,
+            "voiceover_text": [{"text": text}]}
+
+
+class SegmentSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SegmentScheduler(FakeGrabber({"cat": 5}), FakeTTS({"cached words": 4.0}))
+
+    def test_uncached_search_is_dispatched_first(self):
+        segments = [_segment(1, "cat", "cached words"), _segment(2, "dog", "cached words")]
+
+        self.assertEqual([segment["segment_number"] for segment in self.scheduler.order(segments)], [2, 1])
+
+    def test_shared_keyword_is_charged_for_one_search(self):
+        costs = self.scheduler.costs([_segment(1, "dog", "cached words"), _segment(2, "Dog ", "cached words")])
+
+        self.assertAlmostEqual(costs[1] - costs[2], SegmentScheduler.SEARCH_COST)
+
+    def test_uncached_voiceover_predicts_length_from_word_count(self):
+        segment = _segment(1, "cat", "five words of new text")
+
+        self.assertAlmostEqual(self.scheduler.predicted_duration(segment), 5 / SegmentScheduler.WORDS_PER_SECOND)
+        self.assertGreater(self.scheduler.estimate(segment), self.scheduler.estimate(_segment(1, "cat", "cached words")))
+
+
+if __name__ == "__main__":
+    unittest.main()
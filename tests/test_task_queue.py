@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.cluster.task_queue import TaskQueue
+
+
+class TaskQueueTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.queue = TaskQueue(self._tmp.name, max_attempts=2)
+        self.queue.add_run("run", [
+            {"segment_number": 1, "payload": {"segment": 1}, "cost": 1.0},
+            {"segment_number": 2, "payload": {"segment": 2}, "cost": 5.0},
+        ])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _status(self, segment_number: int) -> dict:
+        return next(task for task in self.queue.run_tasks("run") if task["segment_number"] == segment_number)
+
+    def test_claims_most_expensive_task_first_and_only_once(self):
+        first = self.queue.claim("a", 60)
+        second = self.queue.claim("b", 60)
+
+        self.assertEqual((first["segment_number"], first["attempts"]), (2, 1))
+        self.assertEqual(second["segment_number"], 1)
+        self.assertEqual(second["payload"], {"segment": 1})
+        self.assertIsNone(self.queue.claim("c", 60))
+
+    def test_expired_lease_is_redispatched_and_old_holder_is_locked_out(self):
+        lost = self.queue.claim("a", 0.05)
+        self.queue.claim("b", 60)
+        time.sleep(0.1)
+
+        retried = self.queue.claim("c", 60)
+
+        self.assertEqual(retried["id"], lost["id"])
+        self.assertEqual(retried["attempts"], 2)
+        self.assertFalse(self.queue.renew(lost["id"], "a", 60))
+        self.assertFalse(self.queue.complete(lost["id"], "a", {"output_file": "late.mp4"}))
+        self.assertTrue(self.queue.complete(retried["id"], "c", {"output_file": "segment.mp4"}))
+        self.assertEqual(self._status(2)["status"], TaskQueue.DONE)
+        self.assertEqual(self._status(2)["result"], {"output_file": "segment.mp4"})
+
+    def test_renewed_lease_is_not_redispatched(self):
+        task = self.queue.claim("a", 0.2)
+        self.queue.claim("b", 60)
+        self.assertTrue(self.queue.renew(task["id"], "a", 60))
+        time.sleep(0.3)
+
+        self.assertIsNone(self.queue.claim("c", 60))
+
+    def test_task_fails_after_max_attempts_of_expired_leases(self):
+        self.queue.claim("a", 0.05)
+        self.queue.claim("b", 60)
+        time.sleep(0.1)
+        self.queue.claim("c", 0.05)
+        time.sleep(0.1)
+
+        self.assertIsNone(self.queue.claim("d", 60))
+        task = self._status(2)
+        self.assertEqual(task["status"], TaskQueue.FAILED)
+        self.assertEqual(task["error"], "Lease expired too many times")
+
+    def test_failed_attempt_is_released_then_failed_for_good(self):
+        first = self.queue.claim("a", 60)
+        self.queue.claim("b", 60)
+        self.queue.fail(first["id"], "a", "boom")
+        self.assertEqual(self._status(2)["status"], TaskQueue.QUEUED)
+
+        second = self.queue.claim("c", 60)
+        self.assertEqual(second["attempts"], 2)
+        self.queue.fail(second["id"], "c", "boom again")
+
+        task = self._status(2)
+        self.assertEqual((task["status"], task["error"]), (TaskQueue.FAILED, "boom again"))
+
+    def test_cancelled_run_is_not_claimed_and_leases_are_lost(self):
+        task = self.queue.claim("a", 60)
+        self.queue.cancel_run("run")
+
+        self.assertIsNone(self.queue.claim("b", 60))
+        self.assertFalse(self.queue.renew(task["id"], "a", 60))
+        self.assertEqual({task["status"] for task in self.queue.run_tasks("run")}, {TaskQueue.CANCELLED})
+
+    def test_delete_run_removes_its_files(self):
+        self.queue.delete_run("run")
+
+        self.assertFalse(os.path.exists(self.queue.run_dir("run")))
+        self.assertEqual(self.queue.run_tasks("run"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
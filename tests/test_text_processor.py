@@ -0,0 +1,34 @@
+import unittest
+
+from src.text.text_processor import TextProcessor
+
+
+class ProcessEffectsTest(unittest.TestCase):
+    def setUp(self):
+        self.processor = TextProcessor()
+
+    def test_tags_are_parsed_and_removed(self):
+        text, effects = self.processor._process_effects("Hello [TRANSITION: Crossfade 0.5] world [MOTION: kenburns]")
+
+        self.assertEqual(text, "Hello  world")
+        self.assertEqual(effects, {"transition": "crossfade", "transition_duration": 0.5, "motion": "kenburns"})
+
+    def test_missing_tags_use_defaults(self):
+        text, effects = self.processor._process_effects("Plain text")
+
+        self.assertEqual(text, "Plain text")
+        self.assertEqual(effects, {"transition": TextProcessor.DEFAULT_TRANSITION,
+                                   "transition_duration": TextProcessor.DEFAULT_TRANSITION_DURATION,
+                                   "motion": TextProcessor.DEFAULT_MOTION})
+
+    def test_unknown_names_fall_back_to_defaults(self):
+        text, effects = self.processor._process_effects("[TRANSITION: wipe 2] Text [MOTION: spin]")
+
+        self.assertEqual(text, "Text")
+        self.assertEqual(effects["transition"], TextProcessor.DEFAULT_TRANSITION)
+        self.assertEqual(effects["transition_duration"], TextProcessor.DEFAULT_TRANSITION_DURATION)
+        self.assertEqual(effects["motion"], TextProcessor.DEFAULT_MOTION)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from src.video.transitions import KenBurns, crossfade
+
+
+class CrossfadeTest(unittest.TestCase):
+    def setUp(self):
+        self.a = np.full((2, 2, 3), 200, dtype=np.uint8)
+        self.b = np.full((2, 2, 3), 100, dtype=np.uint8)
+
+    def test_ends_return_the_frames_unchanged(self):
+        self.assertIs(crossfade(self.a, self.b, 0.0), self.a)
+        self.assertIs(crossfade(self.a, self.b, 1.0), self.b)
+
+    def test_midpoint_is_the_average(self):
+        blended = crossfade(self.a, self.b, 0.5)
+
+        self.assertEqual(blended.dtype, np.uint8)
+        np.testing.assert_array_equal(blended, np.full((2, 2, 3), 150))
+
+    def test_bright_frames_do_not_overflow(self):
+        white = np.full((2, 2, 3), 255, dtype=np.uint8)
+
+        np.testing.assert_array_equal(crossfade(white, white, 0.3), white)
+
+
+class KenBurnsTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "a.png")
+        self.frame = np.random.default_rng(0).integers(0, 256, (36, 64, 3), dtype=np.uint8)
+        Image.fromarray(self.frame).save(self.path)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_zoom_starts_at_the_full_frame(self):
+        np.testing.assert_array_equal(KenBurns(self.path, index=0).frame_at(0.0), self.frame)
+
+    def test_zoomed_frames_keep_the_frame_size(self):
+        for index in range(5):
+            zoomed = KenBurns(self.path, index=index).frame_at(0.7)
+            self.assertEqual((zoomed.shape, zoomed.dtype), (self.frame.shape, np.uint8))
+        self.assertFalse(np.array_equal(KenBurns(self.path, index=0).frame_at(1.0), self.frame))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from src.utils.cache_manager import CacheManager
+from src.video import video_segment
+from src.video.video_segment import VideoSegment
+
+
+class ResizeImagesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        cache_manager = CacheManager(os.path.join(self.root, "cache.db"), {"temp": (os.path.join(self.root, "temp"), 10 ** 9)})
+        patcher = mock.patch.object(video_segment, "get_cache_manager", return_value=cache_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.source = os.path.join(self.root, "downloads", "cat", "image_1.jpg")
+        os.makedirs(os.path.dirname(self.source))
+        Image.new("RGB", (1600, 1200), (10, 120, 200)).save(self.source, "JPEG")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_concurrent_segments_never_read_a_partial_proxy(self):
+        cache_folder = os.path.join(self.root, "temp", "proxies")
+        barrier = threading.Barrier(6)
+        errors = []
+
+        def build():
+            segment = VideoSegment("", [], "cat", 1)
+            barrier.wait()
+            for _ in range(10):
+                try:
+                    for path in segment._resize_images([self.source], (640, 480), cache_folder):
+                        with Image.open(path) as img:
+                            img.load()
+                    os.utime(self.source)
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=build) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        proxy_dir = os.path.join(cache_folder, "640x480", "cat")
+        self.assertEqual(os.listdir(proxy_dir), ["image_1.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()